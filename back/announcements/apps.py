@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AnnouncementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'announcements'
-    verbose_name = 'Announcements'
\ No newline at end of file
+    verbose_name = 'Announcements'
+    
+    def ready(self):
+        import announcements.signals
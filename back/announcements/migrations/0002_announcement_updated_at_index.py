@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['updated_at'], name='announcemen_updated_bd5be5_idx'),
+        ),
+    ]
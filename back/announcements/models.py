@@ -65,6 +65,9 @@ class Announcement(models.Model):
         ordering = ['-priority', '-start_date']
         verbose_name = 'Announcement'
         verbose_name_plural = 'Announcements'
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.get_announcement_type_display()})"
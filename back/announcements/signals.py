@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from config import cache as api_cache
+from .models import Announcement
+
+
+@receiver([post_save, post_delete], sender=Announcement)
+def announcement_changed(sender, instance, **kwargs):
+    """Purge cached announcement lists whenever one is edited"""
+    transaction.on_commit(lambda: api_cache.invalidate('announcements'))
@@ -1,17 +1,40 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from django.conf import settings
 from django.utils import timezone
+from django.db.models import Count, Max
+from config.cache import cached_response
+from config.conditional import conditional_get
 from .models import Announcement
 from .serializers import AnnouncementSerializer
 
 
+def announcements_state(request, **kwargs):
+    """
+    Validators for announcement lists. Scheduled announcements start and end
+    without their rows changing, so the live set's size and newest start
+    date are part of the ETag too.
+    """
+    now = timezone.now()
+    stats = Announcement.objects.filter(is_active=True, start_date__lte=now).exclude(
+        end_date__lt=now
+    ).aggregate(count=Count('id'), latest_start=Max('start_date'))
+    last_modified = Announcement.objects.aggregate(last_modified=Max('updated_at'))['last_modified']
+    return last_modified, [stats['count'], stats['latest_start']]
+
+
 class AnnouncementListView(generics.ListAPIView):
     """
     List all active announcements
     """
     serializer_class = AnnouncementSerializer
     
+    @conditional_get(announcements_state)
+    @cached_response(['announcements'], namespace='announcements', timeout=settings.ANNOUNCEMENT_CACHE_TIMEOUT)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         queryset = Announcement.objects.filter(is_active=True)
         
@@ -33,6 +56,8 @@ class AnnouncementListView(generics.ListAPIView):
 
 
 @api_view(['GET'])
+@conditional_get(announcements_state)
+@cached_response(['announcements'], namespace='announcements', timeout=settings.ANNOUNCEMENT_CACHE_TIMEOUT)
 def announcements_by_page(request, page_type):
     """
     Get announcements for a specific page type
@@ -0,0 +1,155 @@
+"""
+Tag-versioned API response cache.
+
+Every cached response depends on a set of tags (``catalog``,
+``product:<slug-or-id>``, ``collection:<slug>`` ...). Each tag has a version
+number stored in the cache, and the versions of all of an entry's tags are
+part of its key. Invalidating a tag just bumps its version: every entry that
+depended on it becomes unreachable at once and ages out through its TTL, so
+entries can use long timeouts without ever serving stale data.
+
+Tag versions live in the shared ``default`` cache; responses are stored in
+their namespace's cache (``products``, ``collections``, ``announcements``)
+and also depend on a ``namespace:<name>`` tag, so a namespace can be dropped
+on its own with flush_namespace().
+"""
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache, caches
+from rest_framework.response import Response
+
+CATALOG = 'catalog'
+
+
+def product_tag(key):
+    return f'product:{key}'
+
+
+def collection_tag(key):
+    return f'collection:{key}'
+
+
+def namespace_tag(namespace):
+    return f'namespace:{namespace}'
+
+
+def _tag_key(tag):
+    return f'tag:{tag}'
+
+
+def _new_version():
+    # Time-based so a tag evicted from the cache never comes back with a
+    # version that old entries were stored under
+    return time.time_ns()
+
+
+def tag_versions(tags):
+    """Current version of each tag, creating missing ones"""
+    keys = {_tag_key(tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    for key, tag in keys.items():
+        if tag not in versions:
+            version = _new_version()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+            versions[tag] = version
+    return versions
+
+
+def invalidate(*tags):
+    """Bump the version of each tag, orphaning every entry that uses it"""
+    for tag in set(tags):
+        key = _tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+
+
+def flush_namespace(namespace):
+    """Drop every cached response of one namespace, leaving the others warm"""
+    invalidate(namespace_tag(namespace))
+
+
+def normalized_query(request):
+    """Query string with parameters sorted, so ?a=1&b=2 and ?b=2&a=1 match"""
+    return urlencode(sorted(
+        (name, value)
+        for name, values in request.GET.lists()
+        for value in values
+    ))
+
+
+def request_cache_key(request, versions):
+    """
+    Cache key for a GET request: scheme, host, path, normalized query and tag
+    versions. Paginated responses hold absolute next/previous links built
+    from the request, so each host (and scheme) gets its own entry.
+    """
+    query = normalized_query(request)
+    tags = ','.join(f'{tag}={versions[tag]}' for tag in sorted(versions))
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    digest = hashlib.md5(f'{url}|{tags}'.encode()).hexdigest()
+    return f'response:{digest}'
+
+
+def cached_response(tags, namespace='default', timeout=None):
+    """
+    Cache a DRF view's response data under the given tags.
+
+    Works on view methods and @api_view functions. ``tags`` is a list of tag
+    names or a callable taking the request and the view's URL kwargs and
+    returning one. Only successful GET responses are stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[0] if hasattr(args[0], 'query_params') else args[1]
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            tag_list = tags(request, **kwargs) if callable(tags) else tags
+            versions = tag_versions([*tag_list, namespace_tag(namespace)])
+            key = request_cache_key(request, versions)
+            store = caches[namespace]
+            data = store.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                store.set(key, response.data, timeout or settings.API_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_items(items, build, namespace='default', variant='', timeout=None):
+    """
+    Cache a collection response item by item, so a request for several
+    objects reuses entries stored by earlier requests for other combinations.
+
+    ``items`` maps each item id to its tags, ``build`` takes the ids missing
+    from the cache and returns ``{id: data}``; ``variant`` separates renderings
+    of the same item (e.g. different field selections). Costs two cache round
+    trips plus whatever ``build`` needs for the misses.
+    """
+    versions = tag_versions({namespace_tag(namespace), *(tag for tags in items.values() for tag in tags)})
+    keys = {}
+    for item, tags in items.items():
+        stamp = ','.join(f'{tag}={versions[tag]}' for tag in sorted({*tags, namespace_tag(namespace)}))
+        keys[item] = 'item:' + hashlib.md5(f'{item}|{variant}|{stamp}'.encode()).hexdigest()
+    
+    store = caches[namespace]
+    found = store.get_many(list(keys.values()))
+    results = {item: found[key] for item, key in keys.items() if key in found}
+    missing = [item for item in items if item not in results]
+    if missing:
+        built = build(missing)
+        store.set_many({keys[item]: data for item, data in built.items()}, timeout or settings.API_CACHE_TIMEOUT)
+        results.update(built)
+    return results
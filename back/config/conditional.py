@@ -0,0 +1,57 @@
+"""
+Conditional GET (ETag / Last-Modified) for API views.
+
+Validators are computed from cheap queries - an aggregate over an indexed
+updated_at column for lists, the row's own updated_at for details - so a
+304 is answered without serializing (or even loading) the response body.
+"""
+import hashlib
+from functools import wraps
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from .cache import normalized_query
+
+
+def make_etag(request, last_modified, *parts):
+    """Strong ETag over the request URL and the state the response depends on"""
+    query = normalized_query(request)
+    stamp = last_modified.isoformat() if last_modified else ''
+    source = '|'.join([request.path, query, stamp, *map(str, parts)])
+    return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+
+def conditional_get(validator):
+    """
+    Honour If-None-Match / If-Modified-Since on a DRF view.
+
+    Works on view methods and @api_view functions. ``validator`` takes the
+    request and the view's URL kwargs and returns ``(last_modified, parts)``,
+    where parts is a list of extra values that identify the response state,
+    or None to skip validation (e.g. the object does not exist).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[0] if hasattr(args[0], 'query_params') else args[1]
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            validators = validator(request, **kwargs)
+            if validators is None:
+                return view(*args, **kwargs)
+            last_modified, parts = validators
+            etag = make_etag(request, last_modified, *parts)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if not_modified is not None:
+                return not_modified
+
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+            return response
+        return wrapper
+    return decorator
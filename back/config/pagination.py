@@ -0,0 +1,195 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with a WHERE clause on the current ordering plus the
+primary key as tie-breaker - e.g. ``(created_at, id) < (:created_at, :id)``
+- so every page costs the same index range scan no matter how deep the
+client goes, and no COUNT(*) is issued. Pass ``?page=N`` to opt into
+classic page-number pagination (with a total count) for admin tooling.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PageNumberFallback(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_number_query_param = 'page'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        # Plain lists (e.g. ranked search hits) are already in memory
+        if request.query_params.get(self.page_number_query_param) or not isinstance(queryset, QuerySet):
+            self.fallback = PageNumberFallback()
+            return self.fallback.paginate_queryset(queryset, request, view)
+        self.fallback = None
+
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+        page_size = self.get_page_size(request)
+
+        position, self.reverse = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position))
+        if self.reverse:
+            queryset = queryset.reverse()
+
+        items = list(queryset[:page_size + 1])
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if self.reverse:
+            items.reverse()
+
+        self.has_next = has_more if not self.reverse else position is not None
+        self.has_previous = has_more if self.reverse else position is not None
+        self.first_position = self.position_of(items[0]) if items else None
+        self.last_position = self.position_of(items[-1]) if items else None
+        return items
+
+    def get_ordering(self, queryset):
+        """Current ordering (from OrderingFilter or Meta) with the pk appended"""
+        ordering = [
+            field for field in (queryset.query.order_by or queryset.model._meta.ordering)
+            if isinstance(field, str)
+        ]
+        pk_names = {'pk', 'id', queryset.model._meta.pk.name}
+        if not any(field.lstrip('-') in pk_names for field in ordering):
+            descending = ordering[0].startswith('-') if ordering else True
+            ordering.append('-pk' if descending else 'pk')
+        return ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def keyset_filter(self, position):
+        """Rows strictly after position in the current ordering (lexicographic)"""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != self.reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def position_of(self, item):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = item[name] if isinstance(item, dict) else getattr(item, name)
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            values.append(value)
+        return values
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'o': self.ordering, 'p': position, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, ordering, reverse = payload['p'], payload['o'], bool(payload['r'])
+            if not isinstance(position, list) or not isinstance(ordering, list) or len(position) != len(ordering):
+                raise ValueError('Malformed cursor')
+            if ordering != self.ordering:
+                # Cursor belongs to another sort order; start over
+                return None, False
+            position = [self.cursor_value(field, value) for field, value in zip(ordering, position)]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound('Invalid cursor')
+        return position, reverse
+
+    def cursor_value(self, field, value):
+        """A cursor position value as its ordering field's Python type"""
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError('Malformed cursor')
+        name = field.lstrip('-')
+        try:
+            model_field = self.model._meta.pk if name == 'pk' else self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotation or related lookup: compared as given
+            return value
+        value = model_field.to_python(value)
+        if value is None:
+            raise ValueError('Malformed cursor')
+        return value
+
+    def link(self, position, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_number_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.link(self.last_position, False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self.link(self.first_position, True)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param, 'required': False, 'in': 'query',
+                'description': 'Opaque cursor from a previous next/previous link',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param, 'required': False, 'in': 'query',
+                'description': f'Results per page (max {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.page_number_query_param, 'required': False, 'in': 'query',
+                'description': 'Opt into page-number pagination (includes a total count)',
+                'schema': {'type': 'integer'},
+            },
+        ]
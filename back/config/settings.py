@@ -100,16 +100,68 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Cache Configuration
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000
-        }
+# CACHE_URL picks one backend shared by every gunicorn worker:
+#   redis://host:6379/0          Redis (production)
+#   memcached://host:11211       memcached (production)
+#   file:///var/tmp/babs-cache   filesystem, for single-box deployments
+#   db://cache_table             database table (run createcachetable first)
+#   locmem://                    per-process memory, tests only
+CACHE_URL = config('CACHE_URL', default=f"file://{BASE_DIR / '.cache'}")
+
+# Each namespace gets its own key prefix and version; bump CACHE_<NAME>_VERSION
+# (or run `manage.py flush_cache <name>`) to drop one namespace independently
+CACHE_NAMESPACES = ['products', 'collections', 'announcements']
+
+
+def cache_backend(url, **extra):
+    scheme, _, location = url.partition('://')
+    if scheme in ('redis', 'rediss'):
+        return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url, **extra}
+    if scheme == 'memcached':
+        return {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': location, **extra}
+
+    backends = {
+        'file': 'django.core.cache.backends.filebased.FileBasedCache',
+        'db': 'django.core.cache.backends.db.DatabaseCache',
+        'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+    if scheme not in backends:
+        raise ValueError(f'Unsupported CACHE_URL scheme: {scheme}')
+    return {
+        'BACKEND': backends[scheme],
+        'LOCATION': location or 'babs',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+        **extra,
     }
+
+
+CACHES = {
+    'default': cache_backend(CACHE_URL, KEY_PREFIX='babs'),
+    **{
+        namespace: cache_backend(
+            CACHE_URL,
+            KEY_PREFIX=f'babs:{namespace}',
+            VERSION=config(f'CACHE_{namespace.upper()}_VERSION', default=1, cast=int),
+        )
+        for namespace in CACHE_NAMESPACES
+    },
 }
 
+# API responses are purged by signals (see config/cache.py), so they can live long
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+# Announcements also start and end on a schedule, so keep them short-lived
+ANNOUNCEMENT_CACHE_TIMEOUT = config('ANNOUNCEMENT_CACHE_TIMEOUT', default=60 * 5, cast=int)
+# Most products one /api/products/batch/ request may ask for
+PRODUCT_BATCH_LIMIT = config('PRODUCT_BATCH_LIMIT', default=50, cast=int)
+
+# Minutes an unpaid order holds its stock before release_expired_reservations frees it
+STOCK_RESERVATION_MINUTES = config('STOCK_RESERVATION_MINUTES', default=30, cast=int)
+# 0-15, different on every host/replica creating orders (see orders/ids.py). Required with
+# more than one replica: the host-name fallback collides 1 time in 16 (system check orders.W001).
+# Processes on one host claim slots with lock files in ORDER_ID_LOCK_DIR
+ORDER_ID_HOST = config('ORDER_ID_HOST', default='')
+ORDER_ID_LOCK_DIR = config('ORDER_ID_LOCK_DIR', default='')
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -145,7 +197,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Keyset pagination; ?page=N opts into page numbers (see config/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -1,5 +1,11 @@
-from django.contrib import admin
-from .models import Order, OrderItem, Cart, CartItem, PromoCode
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from . import codes
+from .models import Order, OrderItem, Cart, CartItem, PromoCode, PromoRedemption, StockReservation
 
 
 class OrderItemInline(admin.TabularInline):
@@ -8,13 +14,23 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ['subtotal']
 
 
+class StockReservationInline(admin.TabularInline):
+    model = StockReservation
+    extra = 0
+    can_delete = False
+    readonly_fields = ['variant', 'quantity', 'status', 'expires_at', 'created_at']
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['id', 'full_name', 'email', 'status', 'total', 'created_at']
     list_filter = ['status', 'payment_status', 'created_at']
     search_fields = ['id', 'email', 'full_name']
     readonly_fields = ['id', 'created_at', 'updated_at']
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, StockReservationInline]
     
     fieldsets = (
         ('Order Info', {
@@ -50,8 +66,89 @@ class CartAdmin(admin.ModelAdmin):
     inlines = [CartItemInline]
 
 
+class PromoRedemptionInline(admin.TabularInline):
+    model = PromoRedemption
+    extra = 0
+    can_delete = False
+    readonly_fields = ['order', 'email', 'created_at']
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+# Codes are generated inside the admin request; larger batches go through
+# the generate_promo_codes management command
+ADMIN_MAX_CODES = 5000
+
+
+class GenerateCodesForm(forms.Form):
+    count = forms.IntegerField(
+        min_value=1, max_value=ADMIN_MAX_CODES,
+        help_text=f'Up to {ADMIN_MAX_CODES}; use manage.py generate_promo_codes for larger batches',
+    )
+    prefix = forms.CharField(max_length=20, required=False, help_text='e.g. AMA- gives AMA-7K3M9QXA')
+    batch = forms.CharField(max_length=50)
+
+
 @admin.register(PromoCode)
 class PromoCodeAdmin(admin.ModelAdmin):
-    list_display = ['code', 'discount_type', 'discount_value', 'times_used', 'max_uses', 'is_active']
-    list_filter = ['discount_type', 'is_active', 'valid_from', 'valid_until']
+    list_display = [
+        'code', 'discount_type', 'discount_value', 'times_used', 'max_uses', 'max_uses_per_customer', 'is_active'
+    ]
+    list_filter = ['discount_type', 'is_active', 'batch', 'valid_from', 'valid_until']
     search_fields = ['code', 'description']
+    readonly_fields = ['times_used']
+    inlines = [PromoRedemptionInline]
+    actions = ['generate_codes']
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # times_used is counted by orders.promotions; never write back the value read with the form
+        obj.save(update_fields=[
+            field.name for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name != 'times_used'
+        ])
+    
+    def generate_codes(self, request, queryset):
+        """Create single-use codes with the selected code's terms and download them as CSV"""
+        if queryset.count() != 1:
+            self.message_user(request, 'Select exactly one code to use as the template.', messages.WARNING)
+            return None
+        template = queryset.get()
+        form = GenerateCodesForm(request.POST if 'count' in request.POST else None, initial={
+            'batch': f"{template.code}-{timezone.now():%Y%m%d%H%M}",
+        })
+        if form.is_bound and form.is_valid():
+            fields = {
+                'description': template.description,
+                'discount_type': template.discount_type,
+                'discount_value': template.discount_value,
+                'min_purchase': template.min_purchase,
+                'max_uses_per_customer': template.max_uses_per_customer,
+                'valid_from': template.valid_from,
+                'valid_until': template.valid_until,
+            }
+            batch = form.cleaned_data['batch']
+            try:
+                generated = codes.generate(
+                    form.cleaned_data['count'], batch, prefix=form.cleaned_data['prefix'], **fields
+                )
+            except ValueError as exc:
+                self.message_user(request, str(exc), messages.ERROR)
+                return None
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{batch}.csv"'
+            codes.write_csv(response, generated, batch, max_uses=1, **fields)
+            return response
+        
+        return TemplateResponse(request, 'admin/orders/promocode/generate_codes.html', {
+            **self.admin_site.each_context(request),
+            'title': f'Generate codes like {template.code}',
+            'opts': self.model._meta,
+            'template_code': template,
+            'form': form,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+    generate_codes.short_description = "Generate single-use codes like the selected code"
+
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+from .ids import HOST_BITS
+
+
+@register()
+def order_id_host(app_configs, **kwargs):
+    """ORDER_ID_HOST must be a valid host number, and should be set in production"""
+    value = settings.ORDER_ID_HOST
+    if value == '':
+        if settings.DEBUG:
+            return []
+        return [Warning(
+            'ORDER_ID_HOST is not set; the order id host number is derived from the host name.',
+            hint=(
+                f'Set ORDER_ID_HOST (0-{(1 << HOST_BITS) - 1}) to a different number on every host or '
+                'replica that creates orders. Two replicas falling back to the host name get the same '
+                'number one time in 16 and can issue the same order ids.'
+            ),
+            id='orders.W001',
+        )]
+    if not str(value).isdigit() or int(value) >= 1 << HOST_BITS:
+        return [Error(
+            f'ORDER_ID_HOST must be a number from 0 to {(1 << HOST_BITS) - 1}, not {value!r}.',
+            id='orders.E001',
+        )]
+    return []
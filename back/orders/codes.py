@@ -0,0 +1,128 @@
+"""
+Bulk single-use promo codes.
+
+A code is PREFIX + 8 Crockford base32 characters encoding a 40-bit number.
+The number is a counter pushed through a keyed Feistel permutation: a
+permutation maps distinct counters to distinct numbers, so codes of one
+prefix never collide (no lookups, no retries), while consecutive codes look
+unrelated and cannot be guessed from each other. The key is derived from
+SECRET_KEY and the prefix. The next counter of each prefix is kept in a
+PromoCodeCounter row, locked and advanced once per batch; it is seeded by
+decoding the prefix's existing codes the first time the prefix is used.
+
+Generated codes carry a batch label. They stay out of the in-process rule
+table (promo_rules resolves codes with a known prefix and the generated
+shape with an exact lookup on the unique code index instead) and out of the
+public code list.
+"""
+import csv
+import hashlib
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from .ids import ALPHABET, decode, encode
+from .models import PromoCode, PromoCodeCounter
+
+WIDTH = 8
+HALF_BITS = WIDTH * 5 // 2
+HALF_MASK = (1 << HALF_BITS) - 1
+ROUNDS = 4
+
+CSV_FIELDS = [
+    'code', 'batch', 'description', 'discount_type', 'discount_value', 'min_purchase',
+    'max_uses', 'max_uses_per_customer', 'valid_from', 'valid_until',
+]
+
+
+def _key(prefix):
+    secret = settings.SECRET_KEY.encode()[:64]
+    return hashlib.blake2b(f'promo-codes:{prefix}'.encode(), key=secret, digest_size=32).digest()
+
+
+def _round(key, index, half):
+    digest = hashlib.blake2b(half.to_bytes(4, 'big'), key=key, digest_size=4, salt=bytes([index]) * 16).digest()
+    return int.from_bytes(digest, 'big') & HALF_MASK
+
+
+def permute(number, key):
+    left, right = number >> HALF_BITS, number & HALF_MASK
+    for index in range(ROUNDS):
+        left, right = right, left ^ _round(key, index, right)
+    return (left << HALF_BITS) | right
+
+
+def unpermute(number, key):
+    left, right = number >> HALF_BITS, number & HALF_MASK
+    for index in reversed(range(ROUNDS)):
+        left, right = right ^ _round(key, index, left), left
+    return (left << HALF_BITS) | right
+
+
+def _next_counter(prefix, key):
+    """One past the highest counter used by this prefix's generated codes (scans them all)"""
+    bodies = (
+        code[len(prefix):] for code in
+        PromoCode.objects.filter(code__startswith=prefix).exclude(batch='').values_list('code', flat=True).iterator()
+    )
+    used = [
+        unpermute(decode(body), key) for body in bodies
+        if len(body) == WIDTH and all(char in ALPHABET for char in body)
+    ]
+    return max(used, default=-1) + 1
+
+
+def _claim_counters(prefix, key, count):
+    """First of count consecutive unused counters of prefix, taken under a row lock"""
+    PromoCodeCounter.objects.get_or_create(prefix=prefix, defaults={
+        'next_counter': lambda: _next_counter(prefix, key),
+    })
+    counter = PromoCodeCounter.objects.select_for_update().get(prefix=prefix)
+    start = counter.next_counter
+    if start + count > 1 << (2 * HALF_BITS):
+        raise ValueError(f'Prefix {prefix!r} has run out of codes')
+    counter.next_counter = start + count
+    counter.save(update_fields=['next_counter'])
+    return start
+
+
+def prefixes():
+    """Prefixes of all generated codes (every batch has one prefix)"""
+    firsts = PromoCode.objects.exclude(batch='').values('batch').annotate(first=Min('code'))
+    return {first[:-WIDTH] for first in firsts.values_list('first', flat=True)}
+
+
+def generate(count, batch, prefix='', batch_size=1000, **fields):
+    """
+    Create count codes like PREFIX7K3M9QXA labelled batch, with the given
+    PromoCode fields (single-use unless max_uses is passed), inserting
+    batch_size rows per query. Returns the codes.
+    """
+    if not batch:
+        raise ValueError('Generated codes need a batch label')
+    prefix = prefix.strip().upper()
+    fields.setdefault('max_uses', 1)
+    if len(prefix) + WIDTH > PromoCode._meta.get_field('code').max_length:
+        raise ValueError('Prefix is too long')
+    key = _key(prefix)
+    codes = []
+    with transaction.atomic():
+        start = _claim_counters(prefix, key, count)
+        for offset in range(0, count, batch_size):
+            chunk = [
+                prefix + encode(permute(counter, key), WIDTH)
+                for counter in range(start + offset, start + min(offset + batch_size, count))
+            ]
+            PromoCode.objects.bulk_create([PromoCode(code=code, batch=batch, **fields) for code in chunk])
+            codes.extend(chunk)
+        # promo_rules imports this module; lookups must learn a new prefix
+        from . import promo_rules
+        transaction.on_commit(lambda: promo_rules.invalidate(generated=True))
+    return codes
+
+
+def write_csv(stream, codes, batch, **fields):
+    """Write generated codes (all sharing fields) as CSV, one row per code"""
+    writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for code in codes:
+        writer.writerow({**fields, 'code': code, 'batch': batch})
@@ -0,0 +1,132 @@
+"""
+Order ids.
+
+An id is ORD + 13 Crockford base32 characters of a 64-bit Snowflake-style
+number: 42 bits of milliseconds since EPOCH, 10 bits of worker id and a
+12-bit per-millisecond sequence. Ids from one worker are strictly increasing
+and ids from different workers cannot be equal, so there is nothing to
+retry. The fixed width makes string order match time order: new rows are
+appended at the right edge of the primary key index, and sorting by id
+agrees with -created_at.
+
+The worker id is 4 bits of host and 6 bits of process slot. Set
+ORDER_ID_HOST (0-15) to a different number on each host or replica that
+creates orders; unset, it is derived from the host name, which is only
+unique by luck. Each process, including every forked gunicorn worker, then
+claims a free slot on its host by taking an exclusive lock on one of 64
+lock files in ORDER_ID_LOCK_DIR; the lock is held until the process exits,
+so no two live processes on a host share a slot (flock on POSIX, msvcrt
+byte locks on Windows development machines). Since every host starts at slot
+0, two replicas that fall back to the host name collide one time in 16 and
+can issue equal ids; the orders.W001 system check warns about that whenever
+DEBUG is off. If the clock steps back, or a worker uses up a millisecond's
+4096 sequence numbers, it keeps counting from its last timestamp instead of
+waiting.
+"""
+import os
+import socket
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+PREFIX = 'ORD'
+WIDTH = 13
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+EPOCH_MS = int(EPOCH.timestamp() * 1000)
+HOST_BITS = 4
+SLOT_BITS = 6
+WORKER_BITS = HOST_BITS + SLOT_BITS
+SEQUENCE_BITS = 12
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+_lock = threading.Lock()
+_state = {'pid': None, 'worker': 0, 'last': -1, 'slot_file': None}
+
+
+def encode(number, width):
+    """Crockford base32, zero-padded to width characters"""
+    chars = []
+    for _ in range(width):
+        number, digit = divmod(number, 32)
+        chars.append(ALPHABET[digit])
+    if number:
+        raise ValueError(f'Number does not fit in {width} characters')
+    return ''.join(reversed(chars))
+
+
+def decode(text):
+    number = 0
+    for char in text:
+        number = number * 32 + ALPHABET.index(char)
+    return number
+
+
+def _host():
+    if settings.ORDER_ID_HOST != '':
+        # Range checked by orders.E001
+        return int(settings.ORDER_ID_HOST) % (1 << HOST_BITS)
+    return zlib.crc32(socket.gethostname().encode()) % (1 << HOST_BITS)
+
+
+def _lock_file(slot_file):
+    """Take a non-blocking exclusive lock on an open file; OSError if it is held"""
+    try:
+        import fcntl
+    except ImportError:
+        # Windows (local development)
+        import msvcrt
+        slot_file.seek(0)
+        msvcrt.locking(slot_file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _claim_slot():
+    """Lock the first free slot file on this host; returns (slot, open lock file)"""
+    directory = settings.ORDER_ID_LOCK_DIR or tempfile.gettempdir()
+    for slot in range(1 << SLOT_BITS):
+        slot_file = open(os.path.join(directory, f'babs-order-id-{slot}.lock'), 'a')
+        try:
+            _lock_file(slot_file)
+        except OSError:
+            slot_file.close()
+            continue
+        return slot, slot_file
+    raise RuntimeError(f'All {1 << SLOT_BITS} order id slots on this host are taken')
+
+
+def _next():
+    now = time.time_ns() // 1_000_000 - EPOCH_MS
+    with _lock:
+        if _state['pid'] != os.getpid():
+            # First call, or a forked child: claim a slot of its own (the
+            # parent's lock file stays open here, so the parent keeps its slot)
+            slot, slot_file = _claim_slot()
+            _state.update(
+                pid=os.getpid(), worker=(_host() << SLOT_BITS) | slot, last=-1, slot_file=slot_file
+            )
+        # One counter holds timestamp and sequence: an exhausted sequence
+        # carries into the next millisecond, and a clock step back is ignored
+        _state['last'] = last = max(_state['last'] + 1, now << SEQUENCE_BITS)
+        worker = _state['worker']
+    timestamp, sequence = last >> SEQUENCE_BITS, last & SEQUENCE_MASK
+    return (timestamp << (WORKER_BITS + SEQUENCE_BITS)) | (worker << SEQUENCE_BITS) | sequence
+
+
+def new_order_id():
+    """A new id like ORD0CW5TZ4N1C0G0"""
+    return PREFIX + encode(_next(), WIDTH)
+
+
+def created_at(order_id):
+    """When an id from new_order_id was issued (None for older ids)"""
+    body = order_id[len(PREFIX):]
+    if not order_id.startswith(PREFIX) or len(body) != WIDTH or not all(char in ALPHABET for char in body):
+        return None
+    milliseconds = decode(body) >> (WORKER_BITS + SEQUENCE_BITS)
+    return EPOCH + timedelta(milliseconds=milliseconds)
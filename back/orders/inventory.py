@@ -0,0 +1,144 @@
+"""
+Stock reservations.
+
+Checkout locks the basket's variant rows in id order (SELECT ... FOR UPDATE
+ORDER BY id, so concurrent checkouts for overlapping carts cannot deadlock),
+then decrements all of them with one conditional UPDATE
+(``SET stock = stock - CASE id ... WHERE stock >= CASE id ...``), so two
+buyers can never take the last unit and the number of round trips does not
+grow with the basket. The decremented units are recorded as a held
+StockReservation; paying commits it, and holds on unpaid orders are released
+(stock added back) once they expire.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from products.models import ProductVariant
+from products.signals import STOCK, mark_product_changed
+from .models import StockReservation
+
+
+class InsufficientStock(Exception):
+    def __init__(self, variant_id, requested):
+        self.variant_id = variant_id
+        self.requested = requested
+        super().__init__(f'Not enough stock for variant {variant_id} (requested {requested})')
+
+
+def _stock_changed(deltas):
+    """
+    Purge cached product pages that show these variants' stock; ``deltas``
+    maps variant id to the units just added (negative when taken). Only a
+    variant going in or out of stock changes lists and the in_stock facet.
+    """
+    rows = ProductVariant.objects.filter(pk__in=deltas).values_list('pk', 'product_id', 'stock')
+    for variant_id, product_id, stock in rows:
+        crossed_zero = (stock > 0) != (stock - deltas[variant_id] > 0)
+        mark_product_changed(product_id, model=ProductVariant if crossed_zero else STOCK)
+
+
+def _per_variant(amounts):
+    """CASE expression giving each variant's amount, for single-statement stock updates"""
+    return Case(
+        *(When(pk=variant_id, then=Value(amount)) for variant_id, amount in amounts.items()),
+        default=Value(0), output_field=IntegerField(),
+    )
+
+
+def reserve(order, quantities):
+    """
+    Take stock for an order: ``quantities`` maps variant id to units.
+    Raises InsufficientStock (and takes nothing) if any variant is short.
+    """
+    quantities = {variant_id: qty for variant_id, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return []
+    with transaction.atomic():
+        # Units held by abandoned checkouts go back on sale first
+        release(StockReservation.objects.filter(
+            variant_id__in=quantities, status=StockReservation.HELD, expires_at__lte=timezone.now()
+        ))
+        stock = dict(
+            ProductVariant.objects.select_for_update().filter(pk__in=quantities, is_available=True)
+            .order_by('pk').values_list('pk', 'stock')
+        )
+        for variant_id in sorted(quantities):
+            if stock.get(variant_id, 0) < quantities[variant_id]:
+                raise InsufficientStock(variant_id, quantities[variant_id])
+        
+        amounts = _per_variant(quantities)
+        taken = ProductVariant.objects.filter(
+            pk__in=quantities, is_available=True, stock__gte=amounts
+        ).update(stock=F('stock') - amounts)
+        if taken != len(quantities):
+            # Backends without row locks (SQLite): someone got there first
+            stock = dict(ProductVariant.objects.filter(pk__in=quantities).values_list('pk', 'stock'))
+            variant_id = min(quantities, key=lambda pk: stock.get(pk, 0) - quantities[pk])
+            raise InsufficientStock(variant_id, quantities[variant_id])
+        
+        expires_at = timezone.now() + timedelta(minutes=settings.STOCK_RESERVATION_MINUTES)
+        reservations = StockReservation.objects.bulk_create([
+            StockReservation(order=order, variant_id=variant_id, quantity=qty, expires_at=expires_at)
+            for variant_id, qty in sorted(quantities.items())
+        ])
+        _stock_changed({variant_id: -qty for variant_id, qty in quantities.items()})
+    return reservations
+
+
+def release(reservations):
+    """Give the stock of held reservations back; returns how many were released"""
+    with transaction.atomic():
+        rows = list(
+            reservations.select_for_update().filter(status=StockReservation.HELD)
+            .values_list('pk', 'variant_id', 'quantity')
+        )
+        if not rows:
+            return 0
+        StockReservation.objects.filter(
+            pk__in=[pk for pk, _, _ in rows], status=StockReservation.HELD
+        ).update(status=StockReservation.RELEASED)
+        
+        totals = defaultdict(int)
+        for _, variant_id, quantity in rows:
+            totals[variant_id] += quantity
+        ProductVariant.objects.filter(pk__in=totals).update(stock=F('stock') + _per_variant(totals))
+        _stock_changed(totals)
+    return len(rows)
+
+
+def release_expired(now=None):
+    expired = StockReservation.objects.filter(
+        status=StockReservation.HELD, expires_at__lte=now or timezone.now()
+    )
+    return release(expired)
+
+
+def commit(order):
+    """
+    Make a paid order's reservations permanent. Holds that expired before
+    payment arrived are taken again if the stock is still there; returns
+    the (variant id, quantity) pairs that could not be covered.
+    """
+    shortfalls = []
+    with transaction.atomic():
+        order.reservations.filter(status=StockReservation.HELD).update(status=StockReservation.COMMITTED)
+        lapsed = list(order.reservations.filter(status=StockReservation.RELEASED).order_by('variant_id'))
+        for reservation in lapsed:
+            taken = ProductVariant.objects.filter(
+                pk=reservation.variant_id, stock__gte=reservation.quantity
+            ).update(stock=F('stock') - reservation.quantity)
+            if taken:
+                reservation.status = StockReservation.COMMITTED
+                reservation.save(update_fields=['status'])
+            else:
+                shortfalls.append((reservation.variant_id, reservation.quantity))
+        deltas = defaultdict(int)
+        for reservation in lapsed:
+            if reservation.status == StockReservation.COMMITTED:
+                deltas[reservation.variant_id] -= reservation.quantity
+        if deltas:
+            _stock_changed(deltas)
+    return shortfalls
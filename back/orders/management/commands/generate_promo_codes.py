@@ -0,0 +1,53 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from orders import codes
+
+
+class Command(BaseCommand):
+    help = 'Generate unique single-use promo codes (e.g. for an influencer campaign) and export them as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help='Number of codes to create')
+        parser.add_argument('--prefix', default='', help='Code prefix, e.g. AMA- gives AMA-7K3M9QXA')
+        parser.add_argument('--batch', default='', help='Label for this set of codes (default: prefix and date)')
+        parser.add_argument('--discount-type', choices=['percentage', 'fixed'], default='percentage')
+        parser.add_argument('--discount-value', type=Decimal, required=True)
+        parser.add_argument('--min-purchase', type=Decimal, default=Decimal('0'))
+        parser.add_argument('--max-uses', type=int, default=1, help='Uses per code (default 1)')
+        parser.add_argument('--days', type=int, default=30, help='Days the codes stay valid')
+        parser.add_argument('--description', default='')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+        parser.add_argument('--output', '-o', default='-', help='CSV file to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        if options['count'] < 1:
+            raise CommandError('count must be positive')
+        now = timezone.now()
+        prefix = options['prefix'].strip().upper()
+        batch = options['batch'] or f"{prefix.rstrip('-') or 'CODES'}-{now:%Y%m%d%H%M}"
+        fields = {
+            'description': options['description'],
+            'discount_type': options['discount_type'],
+            'discount_value': options['discount_value'],
+            'min_purchase': options['min_purchase'],
+            'max_uses': options['max_uses'],
+            'valid_from': now,
+            'valid_until': now + timedelta(days=options['days']),
+        }
+        try:
+            generated = codes.generate(
+                options['count'], batch, prefix=prefix, batch_size=options['batch_size'], **fields
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['output'] == '-':
+            codes.write_csv(self.stdout, generated, batch, **fields)
+            return
+        with open(options['output'], 'w', newline='') as stream:
+            codes.write_csv(stream, generated, batch, **fields)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(generated)} codes in batch {batch}; written to {options['output']}"
+        ))
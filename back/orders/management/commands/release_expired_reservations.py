@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from orders import inventory
+
+
+class Command(BaseCommand):
+    help = 'Return stock held by unpaid orders whose reservation has expired (run from cron)'
+
+    def handle(self, *args, **options):
+        released = inventory.release_expired()
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired reservations'))
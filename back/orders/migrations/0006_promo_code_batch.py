@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+def uppercase_codes(apps, schema_editor):
+    PromoCode = apps.get_model('orders', 'PromoCode')
+    
+    taken = set(PromoCode.objects.values_list('code', flat=True))
+    for pk, code in PromoCode.objects.values_list('pk', 'code'):
+        normalized = code.strip().upper()
+        # A code differing from another only in case would collide; leave it for an admin
+        if normalized != code and normalized not in taken:
+            PromoCode.objects.filter(pk=pk).update(code=normalized)
+            taken.add(normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_promo_redemption'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promocode',
+            name='batch',
+            field=models.CharField(blank=True, db_index=True, max_length=50),
+        ),
+        migrations.RunPython(uppercase_codes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_promo_code_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromoCodeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(blank=True, max_length=50, unique=True)),
+                ('next_counter', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
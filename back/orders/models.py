@@ -1,7 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from products.models import Product, ProductVariant
-import uuid
+from .ids import new_order_id
 
 
 class Order(models.Model):
@@ -51,14 +51,19 @@ class Order(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination, for all orders and per guest email
+            models.Index(fields=['created_at', 'id'], name='orders_created_keyset'),
+            models.Index(fields=['email', 'created_at', 'id'], name='orders_email_created_keyset'),
+        ]
         
     def __str__(self):
         return f"Order {self.id}"
     
     def save(self, *args, **kwargs):
         if not self.id:
-            # Generate order ID like ORD123456
-            self.id = f"ORD{str(uuid.uuid4().int)[:6]}"
+            # Time-ordered and unique without a lookup (see orders.ids)
+            self.id = new_order_id()
         super().save(*args, **kwargs)
 
 
@@ -86,6 +91,36 @@ class OrderItem(models.Model):
         super().save(*args, **kwargs)
 
 
+class StockReservation(models.Model):
+    """Stock held for an order until it is paid for or the hold expires"""
+    
+    HELD = 'held'
+    COMMITTED = 'committed'
+    RELEASED = 'released'
+    STATUS_CHOICES = [
+        (HELD, 'Held'),
+        (COMMITTED, 'Committed'),
+        (RELEASED, 'Released'),
+    ]
+    
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=HELD)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['variant_id']
+        indexes = [
+            # release_expired_reservations scans held rows by expiry
+            models.Index(fields=['status', 'expires_at'], name='reservations_expiry'),
+        ]
+    
+    def __str__(self):
+        return f"{self.variant_id} x {self.quantity} for {self.order_id} ({self.status})"
+
+
 class Cart(models.Model):
     """Shopping cart (session-based or user-based)"""
     
@@ -142,7 +177,10 @@ class PromoCode(models.Model):
     discount_value = models.DecimalField(max_digits=10, decimal_places=2)
     min_purchase = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     max_uses = models.IntegerField(null=True, blank=True)
+    max_uses_per_customer = models.PositiveIntegerField(null=True, blank=True)
     times_used = models.IntegerField(default=0)
+    # Label of a generated set of single-use codes (see orders.codes); blank for campaign codes
+    batch = models.CharField(max_length=50, blank=True, db_index=True)
     
     valid_from = models.DateTimeField()
     valid_until = models.DateTimeField()
@@ -153,6 +191,11 @@ class PromoCode(models.Model):
     def __str__(self):
         return self.code
     
+    def save(self, *args, **kwargs):
+        # Codes are matched case-insensitively by exact lookup on the unique index
+        self.code = self.code.strip().upper()
+        super().save(*args, **kwargs)
+    
     def is_valid(self):
         from django.utils import timezone
         now = timezone.now()
@@ -165,3 +208,35 @@ class PromoCode(models.Model):
             return False
         
         return True
+
+
+class PromoCodeCounter(models.Model):
+    """Next unused counter of each generated-code prefix (see orders.codes)"""
+    
+    prefix = models.CharField(max_length=50, unique=True, blank=True)
+    next_counter = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.prefix or '(no prefix)'}: {self.next_counter}"
+
+
+class PromoRedemption(models.Model):
+    """Ledger of promo code uses, one row per order (see orders.promotions)"""
+    
+    promo = models.ForeignKey(PromoCode, on_delete=models.CASCADE, related_name='redemptions')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='promo_redemptions')
+    # Normalized (lowercased) customer email, for per-customer limits
+    email = models.EmailField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['promo', 'order'], name='promo_redemption_once_per_order'),
+        ]
+        indexes = [
+            models.Index(fields=['promo', 'email'], name='promo_redemptions_customer'),
+        ]
+    
+    def __str__(self):
+        return f"{self.promo_id} on {self.order_id}"
@@ -1,10 +1,29 @@
 """
 Paystack payment integration for Ghana
+
+All calls share one requests.Session per process, so the TLS connection to
+api.paystack.co is kept alive and pooled instead of set up for every
+payment. Every request has a connect and a read timeout, and a whole call,
+retries and backoff included, must finish within PAYSTACK_TOTAL_TIMEOUT
+(later attempts get only what is left of it), so a slow Paystack fails the
+call before gunicorn's worker timeout kills the worker. Idempotent GETs are
+retried a bounded number of times with jittered exponential backoff on
+connection errors, timeouts, 429 and 5xx; POSTs are retried only when the
+connection could not be opened (the request was never sent). Each call logs
+its latency, status and attempt count on the orders.paystack logger.
 """
+import logging
+import os
+import random
+import time
 import requests
-from decimal import Decimal
-from django.conf import settings
+from requests.adapters import HTTPAdapter
 from decouple import config
+from .pricing import CURRENCY, to_minor
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 class PaystackAPI:
@@ -15,20 +34,130 @@ class PaystackAPI:
     def __init__(self):
         self.secret_key = config('PAYSTACK_SECRET_KEY', default='')
         self.public_key = config('PAYSTACK_PUBLIC_KEY', default='')
-        
+        self.timeout = (
+            config('PAYSTACK_CONNECT_TIMEOUT', default=3.05, cast=float),
+            config('PAYSTACK_READ_TIMEOUT', default=10, cast=float),
+        )
+        self.max_retries = config('PAYSTACK_MAX_RETRIES', default=2, cast=int)
+        # Budget for a whole call, retries and backoff included; keep it under
+        # the gunicorn worker timeout (30s by default)
+        self.total_timeout = config('PAYSTACK_TOTAL_TIMEOUT', default=20, cast=float)
+        self.backoff = config('PAYSTACK_RETRY_BACKOFF', default=0.25, cast=float)
+        self.pool_size = config('PAYSTACK_POOL_SIZE', default=10, cast=int)
+        self._session = None
+        self._session_pid = None
+    
     def _get_headers(self):
         return {
             'Authorization': f'Bearer {self.secret_key}',
             'Content-Type': 'application/json',
         }
     
+    @property
+    def session(self):
+        """Keep-alive session, created on first use in each (forked) worker"""
+        if self._session is None or self._session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount('https://', adapter)
+            session.headers.update(self._get_headers())
+            self._session, self._session_pid = session, os.getpid()
+        return self._session
+    
+    def _can_retry(self, attempt, deadline):
+        """Another attempt is allowed and there is still time left to connect"""
+        return attempt < self.max_retries and deadline - time.perf_counter() > self.timeout[0]
+    
+    def _sleep_before_retry(self, attempt, deadline):
+        # Full jitter, so concurrent callers do not retry in lockstep; never
+        # sleep into the time the next attempt needs to connect
+        delay = random.uniform(0, min(self.backoff * 2 ** (attempt - 1), 2))
+        time.sleep(max(0, min(delay, deadline - time.perf_counter() - self.timeout[0])))
+    
+    def _attempt_timeout(self, deadline):
+        """(connect, read) timeouts for the next attempt, cut to what is left of the call's budget"""
+        # Connecting and reading are timed separately, so together they must fit
+        left = max(deadline - time.perf_counter(), 0.002)
+        connect = min(self.timeout[0], left / 2)
+        return connect, min(self.timeout[1], left - connect)
+    
+    def _request(self, name, method, path, **kwargs):
+        """
+        Call the API and return its JSON body, or a dict with status False
+        and a message (Paystack's own message when it sent one).
+        """
+        idempotent = method == 'GET'
+        started = time.perf_counter()
+        deadline = started + self.total_timeout
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._sleep_before_retry(attempt, deadline)
+            try:
+                response = self.session.request(
+                    method, f"{self.BASE_URL}{path}", timeout=self._attempt_timeout(deadline), **kwargs
+                )
+            except requests.exceptions.RequestException as e:
+                retryable = isinstance(e, requests.exceptions.ConnectTimeout) or (
+                    idempotent and isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+                )
+                if retryable and self._can_retry(attempt, deadline):
+                    continue
+                self._log(name, started, attempt, error=e)
+                return {
+                    'status': False,
+                    'message': str(e)
+                }
+            if idempotent and response.status_code in RETRY_STATUSES and self._can_retry(attempt, deadline):
+                continue
+            break
+        
+        self._log(name, started, attempt, status_code=response.status_code)
+        try:
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.HTTPError as e:
+            # Return the actual error from Paystack
+            try:
+                error_data = e.response.json()
+                return {
+                    'status': False,
+                    'message': error_data.get('message', str(e)),
+                    'data': error_data
+                }
+            except ValueError:
+                return {
+                    'status': False,
+                    'message': str(e)
+                }
+        except ValueError as e:
+            return {
+                'status': False,
+                'message': f'Invalid response from Paystack: {e}'
+            }
+    
+    def _log(self, name, started, attempt, status_code=None, error=None):
+        """One line per call: the latency metric for dashboards and alerts"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        level = logging.INFO if status_code and status_code < 400 else logging.WARNING
+        logger.log(
+            level, 'paystack %s status=%s attempts=%d elapsed_ms=%.1f%s',
+            name, status_code or 'error', attempt + 1, elapsed_ms,
+            f' error={type(error).__name__}' if error else '',
+            extra={
+                'paystack_call': name,
+                'paystack_status': status_code,
+                'paystack_attempts': attempt + 1,
+                'paystack_elapsed_ms': elapsed_ms,
+            },
+        )
+    
     def initialize_transaction(self, email, amount, reference, callback_url=None, metadata=None):
         """
         Initialize a payment transaction
         
         Args:
             email: Customer email
-            amount: Amount in pesewas (GHS * 100)
+            amount: Amount in GHS (Decimal); sent to Paystack in pesewas
             reference: Unique transaction reference
             callback_url: URL to redirect after payment
             metadata: Additional data (order details, etc.)
@@ -36,44 +165,20 @@ class PaystackAPI:
         Returns:
             dict: Response with authorization_url and access_code
         """
-        url = f"{self.BASE_URL}/transaction/initialize"
-        
         payload = {
             'email': email,
-            'amount': int(amount * 100),  # Convert to pesewas
+            'amount': to_minor(amount),  # Convert to pesewas
             'reference': reference,
-            'currency': 'GHS',
+            'currency': CURRENCY,
         }
         
         if callback_url:
             payload['callback_url'] = callback_url
-            
+        
         if metadata:
             payload['metadata'] = metadata
         
-        try:
-            response = requests.post(url, json=payload, headers=self._get_headers())
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            # Return the actual error from Paystack
-            try:
-                error_data = e.response.json()
-                return {
-                    'status': False,
-                    'message': error_data.get('message', str(e)),
-                    'data': error_data
-                }
-            except:
-                return {
-                    'status': False,
-                    'message': str(e)
-                }
-        except requests.exceptions.RequestException as e:
-            return {
-                'status': False,
-                'message': str(e)
-            }
+        return self._request('initialize_transaction', 'POST', '/transaction/initialize', json=payload)
     
     def verify_transaction(self, reference):
         """
@@ -81,21 +186,11 @@ class PaystackAPI:
         
         Args:
             reference: Transaction reference
-            
+        
         Returns:
             dict: Transaction details
         """
-        url = f"{self.BASE_URL}/transaction/verify/{reference}"
-        
-        try:
-            response = requests.get(url, headers=self._get_headers())
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                'status': False,
-                'message': str(e)
-            }
+        return self._request('verify_transaction', 'GET', f'/transaction/verify/{reference}')
     
     def list_banks(self):
         """
@@ -104,17 +199,7 @@ class PaystackAPI:
         Returns:
             dict: List of banks
         """
-        url = f"{self.BASE_URL}/bank?country=ghana"
-        
-        try:
-            response = requests.get(url, headers=self._get_headers())
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                'status': False,
-                'message': str(e)
-            }
+        return self._request('list_banks', 'GET', '/bank', params={'country': 'ghana'})
     
     def create_transfer_recipient(self, account_number, bank_code, name):
         """
@@ -124,29 +209,19 @@ class PaystackAPI:
             account_number: Bank account number
             bank_code: Bank code from list_banks
             name: Account holder name
-            
+        
         Returns:
             dict: Recipient details
         """
-        url = f"{self.BASE_URL}/transferrecipient"
-        
         payload = {
             'type': 'ghipss',
             'name': name,
             'account_number': account_number,
             'bank_code': bank_code,
-            'currency': 'GHS',
+            'currency': CURRENCY,
         }
         
-        try:
-            response = requests.post(url, json=payload, headers=self._get_headers())
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {
-                'status': False,
-                'message': str(e)
-            }
+        return self._request('create_transfer_recipient', 'POST', '/transferrecipient', json=payload)
 
 
 # Singleton instance
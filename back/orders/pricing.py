@@ -0,0 +1,126 @@
+"""
+Server-side basket pricing.
+
+Prices come from the catalog, never from the client. Every variant in the
+basket is loaded with one in_bulk query (its product through select_related)
+and variant-less lines with one more, and all arithmetic runs in integer
+pesewas (GHS minor units): rounding happens in one place, half-up, and the
+totals are exactly what Paystack is asked to charge. OrderCreateSerializer
+and POST /api/orders/quote/ share quote(), so checkout shows what the order
+will cost.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from products.models import Product, ProductVariant
+from . import promo_rules
+
+CURRENCY = 'GHS'
+MINOR_UNITS = 100
+
+# Baskets over this subtotal ship free; amounts in pesewas
+FREE_SHIPPING_OVER = 150_00
+SHIPPING_FEE = 12_00
+TAX_PERCENT = 8
+
+# Order amounts are DecimalField(max_digits=10, decimal_places=2)
+MAX_AMOUNT = 99_999_999_99
+MAX_LINE_QUANTITY = 1000
+
+
+class PricingError(ValueError):
+    """Basket lines that cannot be priced; errors has one dict per line ({} if fine)"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('Basket cannot be priced')
+
+
+def to_minor(amount):
+    return int((Decimal(amount) * MINOR_UNITS).to_integral_value(ROUND_HALF_UP))
+
+
+def from_minor(minor):
+    return (Decimal(minor) / MINOR_UNITS).quantize(Decimal('0.01'))
+
+
+def percent_of(minor, percent):
+    return int((Decimal(minor) * Decimal(percent) / 100).to_integral_value(ROUND_HALF_UP))
+
+
+class Quote:
+    """A priced basket; every amount is in pesewas (promo is a promo_rules.PromoRule)"""
+
+    def __init__(self, lines, promo=None, promo_code=''):
+        self.lines = lines
+        self.promo = promo
+        self.promo_code = promo_code
+        self.subtotal = sum(line['line_total'] for line in lines)
+        self.shipping = 0 if self.subtotal > FREE_SHIPPING_OVER else SHIPPING_FEE
+        self.tax = percent_of(self.subtotal, TAX_PERCENT)
+        self.discount = promo.discount(self.subtotal) if promo else 0
+        self.total = self.subtotal + self.shipping + self.tax - self.discount
+
+    def as_dict(self):
+        """API representation: amounts as decimal strings (like the serializers), total also in pesewas"""
+        def money(minor):
+            return str(from_minor(minor))
+
+        return {
+            'currency': CURRENCY,
+            'lines': [
+                dict(line, unit_price=money(line['unit_price']), line_total=money(line['line_total']))
+                for line in self.lines
+            ],
+            'subtotal': money(self.subtotal),
+            'shipping': money(self.shipping),
+            'tax': money(self.tax),
+            'discount': money(self.discount),
+            'total': money(self.total),
+            'total_minor': self.total,
+            'promo_code': self.promo_code,
+            'promo_applied': bool(self.discount),
+        }
+
+
+def quote(lines, promo_code=''):
+    """
+    Price basket lines (dicts with product_id and/or variant_id, and quantity)
+    from the catalog. Raises PricingError for lines that cannot be sold.
+    """
+    variant_ids = {line['variant_id'] for line in lines if line.get('variant_id')}
+    variants = ProductVariant.objects.select_related('product').in_bulk(variant_ids) if variant_ids else {}
+    product_ids = {line['product_id'] for line in lines if line.get('product_id') and not line.get('variant_id')}
+    products = Product.objects.in_bulk(product_ids) if product_ids else {}
+
+    priced, errors = [], []
+    for line in lines:
+        variant = variants.get(line.get('variant_id'))
+        product = variant.product if variant else products.get(line.get('product_id'))
+        error = {}
+        if line.get('variant_id') and variant is None:
+            error['variant_id'] = [f"Unknown variant {line['variant_id']}"]
+        elif variant and line.get('product_id') and variant.product_id != line['product_id']:
+            error['variant_id'] = [f"Variant {variant.pk} is not a size of {line['product_id']}"]
+        elif product is None:
+            error['product_id'] = [f"Unknown product {line.get('product_id')}"]
+        elif not product.is_active:
+            error['product_id'] = [f'{product.name} is no longer available']
+        errors.append(error)
+        if error:
+            continue
+
+        unit_price = to_minor(variant.price if variant else product.price)
+        priced.append({
+            'product_id': product.pk,
+            'variant_id': variant.pk if variant else None,
+            'name': product.name,
+            'image': product.primary_image_url,
+            'variant_label': variant.label if variant else '',
+            'quantity': line['quantity'],
+            'unit_price': unit_price,
+            'line_total': unit_price * line['quantity'],
+        })
+    if any(errors):
+        raise PricingError(errors)
+
+    promo = promo_rules.lookup(promo_code) if promo_code else None
+    return Quote(priced, promo=promo, promo_code=promo_code)
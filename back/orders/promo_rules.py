@@ -0,0 +1,153 @@
+"""
+In-process promo rule table.
+
+During campaigns the promo validate endpoint is called on every keystroke of
+the checkout page. Each process compiles the active codes into a dict keyed
+by normalized code, holding the validity window, minimum purchase and a
+discount function in pesewas, so validating or pricing a code needs no
+database query. As in products.keys, a generation number in the shared
+default cache is bumped (on commit) when a code is saved or deleted, or a
+capped code is redeemed; a process rebuilds its table when it sees a newer
+generation, and also once the clock passes the next valid_from/valid_until
+boundary.
+
+Generated single-use codes (orders.codes) can number in the millions, so
+they are not compiled into the table. Only a code the table does not know
+that has the generated shape (a known prefix plus 8 base32 characters) is
+looked up, by an exact match on the unique code index (one O(log n)
+query); partial keystrokes never have that shape, and codes that were not
+found are remembered until the next rebuild.
+"""
+import threading
+import time
+from django.core.cache import cache
+from django.utils import timezone
+from . import codes, pricing
+from .models import PromoCode
+
+GENERATION_KEY = 'orders:promo_rules:generation'
+PREFIXES_KEY = 'orders:promo_rules:generated_prefixes'
+# Unknown codes remembered per process, so guessing cannot grow memory without bound
+MISSES_LIMIT = 10_000
+
+_lock = threading.Lock()
+_state = {'generation': None, 'rules': {}, 'expires_at': None, 'prefixes': frozenset(), 'misses': set()}
+
+
+def normalize_code(code):
+    return (code or '').strip().upper()
+
+
+class PromoRule:
+    """A compiled PromoCode; amounts are in pesewas"""
+
+    def __init__(self, promo):
+        self.pk = promo.pk
+        self.code = promo.code
+        self.batch = promo.batch
+        self.valid_from = promo.valid_from
+        self.valid_until = promo.valid_until
+        self.min_purchase = pricing.to_minor(promo.min_purchase)
+        self.max_uses = promo.max_uses
+        self.max_uses_per_customer = promo.max_uses_per_customer
+        self.times_used = promo.times_used
+        # Same shape as PromoCodeSerializer
+        self.data = {
+            'code': promo.code,
+            'description': promo.description,
+            'discount_type': promo.discount_type,
+            'discount_value': f'{promo.discount_value:.2f}',
+            'min_purchase': f'{promo.min_purchase:.2f}',
+        }
+        if promo.discount_type == 'percentage':
+            percent = promo.discount_value
+            self._discount = lambda subtotal: pricing.percent_of(subtotal, percent)
+        else:
+            amount = pricing.to_minor(promo.discount_value)
+            self._discount = lambda subtotal: amount
+
+    def is_valid(self, now=None):
+        now = now or timezone.now()
+        if now < self.valid_from or now > self.valid_until:
+            return False
+        return not (self.max_uses and self.times_used >= self.max_uses)
+
+    def discount(self, subtotal, now=None):
+        """Discount for a subtotal in pesewas; 0 if the code does not apply"""
+        if not self.is_valid(now) or subtotal < self.min_purchase:
+            return 0
+        return min(self._discount(subtotal), subtotal)
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(GENERATION_KEY, generation, None):
+            generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def _build(now):
+    promos = PromoCode.objects.filter(is_active=True, valid_until__gte=now, batch='')
+    rules = {normalize_code(promo.code): PromoRule(promo) for promo in promos}
+    boundaries = [
+        moment for rule in rules.values() for moment in (rule.valid_from, rule.valid_until) if moment > now
+    ]
+    return rules, min(boundaries, default=None)
+
+
+def _generated_prefixes():
+    prefixes = cache.get(PREFIXES_KEY)
+    if prefixes is None:
+        prefixes = frozenset(codes.prefixes())
+        cache.set(PREFIXES_KEY, prefixes, None)
+    return prefixes
+
+
+def rules():
+    generation = _generation()
+    now = timezone.now()
+    if _state['generation'] != generation or (_state['expires_at'] and now >= _state['expires_at']):
+        with _lock:
+            if _state['generation'] != generation or (_state['expires_at'] and now >= _state['expires_at']):
+                _state['rules'], _state['expires_at'] = _build(now)
+                _state['prefixes'], _state['misses'] = _generated_prefixes(), set()
+                _state['generation'] = generation
+    return _state['rules']
+
+
+def _generated_shape(code, prefixes):
+    prefix, body = code[:-codes.WIDTH], code[-codes.WIDTH:]
+    return len(code) >= codes.WIDTH and prefix in prefixes and all(char in codes.ALPHABET for char in body)
+
+
+def lookup(code):
+    """Rule for an active, unexpired code (any case), or None"""
+    code = normalize_code(code)
+    rule = rules().get(code)
+    if rule is not None or not code:
+        return rule
+    misses = _state['misses']
+    if code in misses or not _generated_shape(code, _state['prefixes']):
+        return None
+    
+    promo = PromoCode.objects.filter(
+        code=code, is_active=True, valid_until__gte=timezone.now()
+    ).exclude(batch='').first()
+    if promo is None:
+        if len(misses) >= MISSES_LIMIT:
+            misses.clear()
+        misses.add(code)
+        return None
+    return PromoRule(promo)
+
+
+def invalidate(generated=False):
+    """
+    Make every process rebuild its table on its next lookup; generated=True
+    also re-reads the prefixes of generated codes
+    """
+    if generated:
+        cache.delete(PREFIXES_KEY)
+    cache.set(GENERATION_KEY, time.time_ns(), None)
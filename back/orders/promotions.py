@@ -0,0 +1,55 @@
+"""
+Promo code redemption.
+
+A use is taken with one conditional UPDATE
+(``SET times_used = times_used + 1 WHERE times_used < max_uses AND ...``),
+so concurrent checkouts can never push a code past max_uses and the promo
+row is never rewritten from a stale read. The UPDATE also locks the promo
+row until the order's transaction ends, which serializes redemptions of the
+same code: the per-customer count that follows (an index range scan on
+(promo, email)) cannot race another checkout for the same customer. To keep
+that lock short, checkout redeems as its last step, after the items and the
+stock reservation are written. Each use
+is recorded in the PromoRedemption ledger; if any check fails the enclosing
+transaction rolls the increment back.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import PromoCode, PromoRedemption
+from . import promo_rules
+
+
+class PromoUnavailable(Exception):
+    """The code cannot be redeemed (exhausted, expired or over the customer's limit)"""
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def redeem(promo, order, email):
+    """Take one use of promo (a PromoCode or PromoRule) for order; raises PromoUnavailable"""
+    email = normalize_email(email)
+    now = timezone.now()
+    with transaction.atomic():
+        taken = PromoCode.objects.filter(
+            Q(max_uses__isnull=True) | Q(max_uses=0) | Q(times_used__lt=F('max_uses')),
+            pk=promo.pk, is_active=True, valid_from__lte=now, valid_until__gte=now,
+        ).update(times_used=F('times_used') + 1)
+        if not taken:
+            raise PromoUnavailable(f'Promo code {promo.code} is no longer available')
+        if promo.max_uses and not promo.batch:
+            # Cached rule tables must see the cap being reached (generated codes are not cached)
+            transaction.on_commit(promo_rules.invalidate)
+
+        if promo.max_uses_per_customer:
+            used = PromoRedemption.objects.filter(promo_id=promo.pk, email=email).count()
+            if used >= promo.max_uses_per_customer:
+                raise PromoUnavailable(f'Promo code {promo.code} has already been used')
+
+        try:
+            with transaction.atomic():
+                return PromoRedemption.objects.create(promo_id=promo.pk, order=order, email=email)
+        except IntegrityError:
+            raise PromoUnavailable(f'Promo code {promo.code} is already applied to order {order.pk}')
@@ -1,5 +1,8 @@
+from collections import Counter
+from django.db import transaction
 from rest_framework import serializers
 from .models import Order, OrderItem, Cart, CartItem, PromoCode
+from . import inventory, pricing, promotions
 from products.serializers import ProductListSerializer
 
 
@@ -28,8 +31,40 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'payment_reference']
 
 
-class OrderCreateSerializer(serializers.ModelSerializer):
-    items = serializers.ListField(write_only=True)
+class OrderLineSerializer(serializers.Serializer):
+    """
+    One basket line. Name, image and price are taken from the catalog
+    (orders.pricing), so clients only say what and how many.
+    """
+    
+    product_id = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    variant_id = serializers.IntegerField(required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=1, max_value=pricing.MAX_LINE_QUANTITY)
+
+
+class PricedBasketMixin:
+    """Prices the validated items and promo_code into attrs['quote'] (see orders.pricing)"""
+    
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        try:
+            attrs['quote'] = pricing.quote(attrs['items'], attrs.get('promo_code', ''))
+        except pricing.PricingError as exc:
+            raise serializers.ValidationError({'items': exc.errors})
+        if max(attrs['quote'].subtotal, attrs['quote'].total) > pricing.MAX_AMOUNT:
+            raise serializers.ValidationError({'items': ['Order total is too large']})
+        return attrs
+
+
+class QuoteSerializer(PricedBasketMixin, serializers.Serializer):
+    """Basket to price: POST /api/orders/quote/"""
+    
+    items = OrderLineSerializer(many=True, allow_empty=False)
+    promo_code = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+
+
+class OrderCreateSerializer(PricedBasketMixin, serializers.ModelSerializer):
+    items = OrderLineSerializer(many=True, write_only=True, allow_empty=False)
     id = serializers.CharField(read_only=True)
     total = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
@@ -41,55 +76,59 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             'payment_method', 'promo_code', 'total', 'items'
         ]
     
+    @transaction.atomic
     def create(self, validated_data):
-        items_data = validated_data.pop('items')
-        
-        # Calculate totals
-        subtotal = sum(item['price'] * item['quantity'] for item in items_data)
-        shipping_cost = 0 if subtotal > 150 else 12
-        tax = subtotal * 0.08
-        discount = 0
-        
-        # Apply promo code if provided
-        promo_code = validated_data.get('promo_code')
-        if promo_code:
-            try:
-                promo = PromoCode.objects.get(code=promo_code)
-                if promo.is_valid() and subtotal >= promo.min_purchase:
-                    if promo.discount_type == 'percentage':
-                        discount = subtotal * (promo.discount_value / 100)
-                    else:
-                        discount = promo.discount_value
-                    promo.times_used += 1
-                    promo.save()
-            except PromoCode.DoesNotExist:
-                pass
-        
-        total = subtotal + shipping_cost + tax - discount
+        validated_data.pop('items')
+        quote = validated_data.pop('quote')
         
         # Create order
         order = Order.objects.create(
             **validated_data,
-            subtotal=subtotal,
-            shipping_cost=shipping_cost,
-            tax=tax,
-            discount_amount=discount,
-            total=total,
+            subtotal=pricing.from_minor(quote.subtotal),
+            shipping_cost=pricing.from_minor(quote.shipping),
+            tax=pricing.from_minor(quote.tax),
+            discount_amount=pricing.from_minor(quote.discount),
+            total=pricing.from_minor(quote.total),
             payment_status='pending'
         )
         
-        # Create order items
-        for item_data in items_data:
-            OrderItem.objects.create(
+        # Create order items (one INSERT; bulk_create skips save(), so subtotals are set here)
+        OrderItem.objects.bulk_create([
+            OrderItem(
                 order=order,
-                product_id=item_data.get('product_id'),
-                variant_id=item_data.get('variant_id'),
-                product_name=item_data['name'],
-                product_image=item_data.get('image', ''),
-                variant_label=item_data.get('variant_label', ''),
-                quantity=item_data['quantity'],
-                price=item_data['price']
+                product_id=line['product_id'],
+                variant_id=line['variant_id'],
+                product_name=line['name'],
+                product_image=line['image'],
+                variant_label=line['variant_label'],
+                quantity=line['quantity'],
+                price=pricing.from_minor(line['unit_price']),
+                subtotal=pricing.from_minor(line['line_total']),
             )
+            for line in quote.lines
+        ])
+        
+        # Hold the stock until payment; a shortfall rolls the whole order back
+        quantities = Counter()
+        for line in quote.lines:
+            if line['variant_id']:
+                quantities[line['variant_id']] += line['quantity']
+        try:
+            inventory.reserve(order, quantities)
+        except inventory.InsufficientStock as exc:
+            raise serializers.ValidationError({
+                'items': [f'Not enough stock for variant {exc.variant_id}'],
+                'variant_id': exc.variant_id,
+            })
+        
+        # Take a use of the promo code last: the UPDATE locks the promo row until
+        # commit, so checkouts sharing a campaign code only queue for this final step.
+        # Losing the race to max_uses fails the whole order
+        if quote.discount:
+            try:
+                promotions.redeem(quote.promo, order, order.email)
+            except promotions.PromoUnavailable as exc:
+                raise serializers.ValidationError({'promo_code': [str(exc)]})
         
         return order
 
@@ -105,6 +144,11 @@ class PaystackVerifySerializer(serializers.Serializer):
     reference = serializers.CharField()
 
 
+class PromoValidateSerializer(serializers.Serializer):
+    """Subtotal a promo code is validated against (same bounds as Order.subtotal)"""
+    subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, default=0)
+
+
 class CartItemSerializer(serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
     price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
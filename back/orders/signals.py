@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import PromoCode
+from . import promo_rules
+
+
+@receiver([post_save, post_delete], sender=PromoCode)
+def promo_code_changed(sender, instance, **kwargs):
+    """Make every process recompile its promo rule table"""
+    transaction.on_commit(promo_rules.invalidate)
@@ -0,0 +1,272 @@
+import os
+import sys
+import types
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from config import cache as api_cache
+from products import documents
+from products.models import Product, ProductVariant
+import requests
+from . import codes, ids, inventory, promo_rules
+from .paystack import PaystackAPI
+from .models import Order, PromoCode, PromoCodeCounter, StockReservation
+
+# Keep tests out of the shared cache (promo rule generations, purged pages)
+TEST_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'orders-tests-{alias}'}
+    for alias in settings.CACHES
+}
+
+# Order placement costs the same number of queries whatever the basket size
+ORDER_QUERIES = 25
+
+
+def make_variants(count, stock=10, price='50.00'):
+    variants = []
+    for index in range(count):
+        product = Product.objects.create(
+            id=f'scent-{index}', name=f'Scent {index}', slug=f'scent-{index}', description='', price=price
+        )
+        variants.append(ProductVariant.objects.create(
+            product=product, label='50ml', volume='50ml', price=price, sku=f'SCENT-{index}-50', stock=stock
+        ))
+    return variants
+
+
+@override_settings(CACHES=TEST_CACHES)
+class OrderCreateTests(TestCase):
+    def setUp(self):
+        promo_rules.invalidate()
+        # Run the catalog refresh for the new products now, not inside the first order
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variants = make_variants(15)
+    
+    def place(self, quantities, promo_code='', email='ama@example.com'):
+        # Run on-commit work (rule table invalidation, cache purges) as a real commit would
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/orders/', {
+                'email': email,
+                'full_name': 'Ama Mensah',
+                'shipping_address': '1 Oxford Street',
+                'shipping_city': 'Accra',
+                'shipping_postal_code': 'GA-100',
+                'promo_code': promo_code,
+                'items': [{'variant_id': variant.pk, 'quantity': qty} for variant, qty in quantities],
+            }, content_type='application/json', HTTP_HOST='localhost')
+    
+    def test_query_count_does_not_grow_with_basket(self):
+        for quantities in ([(self.variants[0], 1)], [(variant, 2) for variant in self.variants]):
+            with self.subTest(lines=len(quantities)):
+                # Including the cache purge that runs on commit
+                with self.assertNumQueries(ORDER_QUERIES):
+                    response = self.place(quantities)
+                self.assertEqual(response.status_code, 201, response.content)
+    
+    def test_prices_come_from_catalog(self):
+        response = self.place([(self.variants[0], 2)])
+        order = Order.objects.get(pk=response.json()['id'])
+        self.assertEqual(order.subtotal, 100)
+        self.assertEqual(order.total, order.subtotal + order.shipping_cost + order.tax)
+        self.assertEqual(order.items.get().subtotal, 100)
+    
+    def test_oversell_takes_nothing(self):
+        first, second = self.variants[:2]
+        response = self.place([(first, 1), (second, 11)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['variant_id'], str(second.pk))
+        self.assertEqual(ProductVariant.objects.get(pk=first.pk).stock, 10)
+        self.assertFalse(Order.objects.exists())
+    
+    def test_last_unit_sold_once(self):
+        variant = self.variants[0]
+        self.assertEqual(self.place([(variant, 10)]).status_code, 201)
+        self.assertEqual(self.place([(variant, 1)]).status_code, 400)
+        self.assertEqual(ProductVariant.objects.get(pk=variant.pk).stock, 0)
+    
+    def test_catalog_cache_kept_until_stock_runs_out(self):
+        variant = self.variants[0]
+        tags = [api_cache.CATALOG, api_cache.product_tag(variant.product_id)]
+        before = api_cache.tag_versions(tags)
+        self.place([(variant, 4)])
+        after = api_cache.tag_versions(tags)
+        self.assertEqual(after[api_cache.CATALOG], before[api_cache.CATALOG])
+        self.assertNotEqual(after[tags[1]], before[tags[1]])
+        self.assertEqual(documents.get(variant.product_id)['sizes'][0]['stock'], 6)
+        self.place([(variant, 6)])
+        self.assertNotEqual(api_cache.tag_versions(tags)[api_cache.CATALOG], before[api_cache.CATALOG])
+    
+    def test_unknown_variant(self):
+        response = self.client.post('/api/orders/', {
+            'email': 'ama@example.com', 'full_name': 'Ama Mensah', 'shipping_address': '1 Oxford Street',
+            'shipping_city': 'Accra', 'shipping_postal_code': 'GA-100',
+            'items': [{'variant_id': self.variants[0].pk, 'quantity': 1}, {'variant_id': 999999, 'quantity': 1}],
+        }, content_type='application/json', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['items'][1], {'variant_id': ['Unknown variant 999999']})
+        self.assertFalse(Order.objects.exists())
+    
+    def test_quantity_is_bounded(self):
+        response = self.place([(self.variants[0], 10 ** 9)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('items', response.json())
+    
+    def test_promo_exhaustion(self):
+        now = timezone.now()
+        PromoCode.objects.create(
+            code='launch', discount_value=10, max_uses=2, max_uses_per_customer=1,
+            valid_from=now - timedelta(days=1), valid_until=now + timedelta(days=1),
+        )
+        self.assertEqual(self.place([(self.variants[0], 1)], 'LAUNCH', 'a@example.com').status_code, 201)
+        # Per-customer limit, whatever the email's case
+        self.assertEqual(self.place([(self.variants[1], 1)], 'launch', 'A@Example.com').status_code, 400)
+        self.assertEqual(self.place([(self.variants[2], 1)], 'launch', 'b@example.com').status_code, 201)
+        # Exhausted: the quote no longer applies the code, so no discount is taken
+        response = self.place([(self.variants[3], 1)], 'launch', 'c@example.com')
+        self.assertEqual(Order.objects.get(pk=response.json()['id']).discount_amount, 0)
+        promo = PromoCode.objects.get(code='LAUNCH')
+        self.assertEqual(promo.times_used, 2)
+        self.assertEqual(promo.redemptions.count(), 2)
+        # A failed redemption rolled back that order's stock hold
+        self.assertEqual(ProductVariant.objects.get(pk=self.variants[1].pk).stock, 10)
+    
+    def test_promo_redeemed_by_stale_rule(self):
+        now = timezone.now()
+        PromoCode.objects.create(
+            code='ONCE', discount_value=10, max_uses=1,
+            valid_from=now - timedelta(days=1), valid_until=now + timedelta(days=1),
+        )
+        rule = promo_rules.lookup('once')
+        self.assertEqual(self.place([(self.variants[0], 1)], 'ONCE').status_code, 201)
+        # Another process still holding the old table: the guarded UPDATE refuses
+        from . import promotions
+        order = Order.objects.first()
+        with self.assertRaises(promotions.PromoUnavailable):
+            promotions.redeem(rule, order, 'other@example.com')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.variant, = make_variants(1, stock=5)
+        self.order = Order.objects.create(
+            email='ama@example.com', full_name='Ama Mensah', shipping_address='1 Oxford Street',
+            shipping_city='Accra', shipping_postal_code='GA-100', subtotal=0, total=0,
+        )
+    
+    def stock(self):
+        return ProductVariant.objects.get(pk=self.variant.pk).stock
+    
+    def test_release_expired_returns_stock_once(self):
+        inventory.reserve(self.order, {self.variant.pk: 3})
+        self.assertEqual(self.stock(), 2)
+        later = timezone.now() + timedelta(minutes=settings.STOCK_RESERVATION_MINUTES + 1)
+        self.assertEqual(inventory.release_expired(later), 1)
+        self.assertEqual(inventory.release_expired(later), 0)
+        self.assertEqual(self.stock(), 5)
+    
+    def test_commit_retakes_lapsed_stock(self):
+        inventory.reserve(self.order, {self.variant.pk: 3})
+        inventory.release(self.order.reservations.all())
+        self.assertEqual(inventory.commit(self.order), [])
+        self.assertEqual(self.stock(), 2)
+        self.assertEqual(self.order.reservations.get().status, StockReservation.COMMITTED)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CodeGenerationTests(TestCase):
+    TERMS = {'discount_value': 10, 'valid_from': timezone.now(), 'valid_until': timezone.now() + timedelta(days=1)}
+    
+    def test_batches_continue_from_the_counter(self):
+        first = codes.generate(50, 'first', prefix='AMA-', **self.TERMS)
+        # Later batches read one counter row, not the codes generated so far
+        with self.assertNumQueries(6):
+            second = codes.generate(50, 'second', prefix='AMA-', **self.TERMS)
+        self.assertEqual(len(set(first) | set(second)), 100)
+        self.assertEqual(PromoCodeCounter.objects.get(prefix='AMA-').next_counter, 100)
+    
+    def test_counter_is_seeded_from_existing_codes(self):
+        first = codes.generate(20, 'first', prefix='KOFI-', **self.TERMS)
+        PromoCodeCounter.objects.all().delete()
+        second = codes.generate(5, 'second', prefix='KOFI-', **self.TERMS)
+        self.assertFalse(set(first) & set(second))
+        self.assertEqual(PromoCodeCounter.objects.get(prefix='KOFI-').next_counter, 25)
+
+class OrderIdTests(TestCase):
+    def test_ids_are_unique_and_ordered(self):
+        issued = [ids.new_order_id() for _ in range(10000)]
+        self.assertEqual(len(set(issued)), len(issued))
+        self.assertEqual(issued, sorted(issued))
+        self.assertTrue(all(len(order_id) == len(ids.PREFIX) + ids.WIDTH for order_id in issued))
+    
+    def test_clock_step_back_stays_monotonic(self):
+        before = ids.new_order_id()
+        ids._state['last'] += 5000 << ids.SEQUENCE_BITS
+        self.assertLess(before, ids.new_order_id())
+    
+    def test_slots_are_exclusive(self):
+        slot, slot_file = ids._claim_slot()
+        try:
+            other, other_file = ids._claim_slot()
+            other_file.close()
+            self.assertNotEqual(slot, other)
+        finally:
+            slot_file.close()
+    
+    def test_windows_falls_back_to_msvcrt(self):
+        held = set()
+        
+        def locking(fileno, mode, size):
+            inode = os.fstat(fileno).st_ino
+            if inode in held:
+                raise OSError('locked')
+            held.add(inode)
+        
+        msvcrt = types.SimpleNamespace(LK_NBLCK=2, locking=locking)
+        with mock.patch.dict(sys.modules, {'fcntl': None, 'msvcrt': msvcrt}):
+            slot, slot_file = ids._claim_slot()
+            other, other_file = ids._claim_slot()
+        slot_file.close()
+        other_file.close()
+        self.assertNotEqual(slot, other)
+    
+    def test_unset_host_is_reported_in_production(self):
+        def messages():
+            return {message.id for message in run_checks()}
+        with override_settings(DEBUG=False, ORDER_ID_HOST=''):
+            self.assertIn('orders.W001', messages())
+        with override_settings(DEBUG=False, ORDER_ID_HOST='3'):
+            self.assertFalse({'orders.W001', 'orders.E001'} & messages())
+        with override_settings(ORDER_ID_HOST='16'):
+            self.assertIn('orders.E001', messages())
+
+
+
+class PaystackTimeoutTests(TestCase):
+    def test_retries_stay_within_the_total_timeout(self):
+        clock = types.SimpleNamespace(now=0.0)
+        timeouts = []
+        
+        def request(method, url, timeout, **kwargs):
+            # Paystack never answers: every attempt uses its whole read timeout
+            timeouts.append(timeout)
+            clock.now += timeout[0] / 10 + timeout[1]
+            raise requests.exceptions.ReadTimeout('read timed out')
+        
+        fake_time = types.SimpleNamespace(
+            perf_counter=lambda: clock.now, sleep=lambda seconds: setattr(clock, 'now', clock.now + seconds)
+        )
+        api = PaystackAPI()
+        api.timeout, api.max_retries, api.total_timeout = (3.05, 10), 5, 20
+        api._session, api._session_pid = types.SimpleNamespace(request=request), os.getpid()
+        with mock.patch('orders.paystack.time', fake_time):
+            result = api.verify_transaction('ref-1')
+        self.assertFalse(result['status'])
+        self.assertLessEqual(clock.now, 20)
+        self.assertEqual(timeouts[0], (3.05, 10))
+        self.assertGreater(len(timeouts), 1)
+        self.assertLess(timeouts[-1][1], 10)
@@ -9,9 +9,10 @@ from .models import Order, Cart, CartItem, PromoCode
 from .serializers import (
     OrderSerializer, OrderCreateSerializer,
     CartSerializer, CartItemSerializer, PromoCodeSerializer,
-    PaystackInitializeSerializer, PaystackVerifySerializer
+    PaystackInitializeSerializer, PaystackVerifySerializer, PromoValidateSerializer, QuoteSerializer
 )
 from .paystack import paystack
+from . import inventory, pricing, promo_rules
 from products.models import Product, ProductVariant
 
 
@@ -22,6 +23,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     list: Get all orders (for authenticated user)
     retrieve: Get a single order
     create: Create a new order
+    quote: Price a basket (lines, shipping, tax, promo) without placing it
     initialize_payment: Initialize Paystack payment
     verify_payment: Verify Paystack payment
     """
@@ -32,6 +34,8 @@ class OrderViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'create':
             return OrderCreateSerializer
+        elif self.action == 'quote':
+            return QuoteSerializer
         elif self.action == 'initialize_payment':
             return PaystackInitializeSerializer
         elif self.action == 'verify_payment':
@@ -59,6 +63,21 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(order)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def quote(self, request):
+        """
+        Price a basket from the catalog, exactly as placing the order would
+        
+        POST /api/orders/quote/
+        {
+            "items": [{"product_id": "velvet-oud", "variant_id": 3, "quantity": 2}],
+            "promo_code": "WELCOME10"
+        }
+        """
+        serializer = QuoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.validated_data['quote'].as_dict())
+    
     @action(detail=False, methods=['post'])
     def initialize_payment(self, request):
         """
@@ -66,8 +85,8 @@ class OrderViewSet(viewsets.ModelViewSet):
         
         POST /api/orders/initialize_payment/
         {
-            "order_id": "ORD123456",
-            "callback_url": "http://localhost:8080/order/ORD123456/confirmation"
+            "order_id": "ORD0A8WDB0Z1PR00",
+            "callback_url": "http://localhost:8080/order/ORD0A8WDB0Z1PR00/confirmation"
         }
         """
         serializer = PaystackInitializeSerializer(data=request.data)
@@ -95,7 +114,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         # Initialize payment with Paystack
         result = paystack.initialize_transaction(
             email=order.email,
-            amount=float(order.total),
+            amount=order.total,
             reference=reference,
             callback_url=callback_url,
             metadata={
@@ -142,7 +161,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         
         POST /api/orders/verify_payment/
         {
-            "reference": "PAY-ORD123456-1234567890"
+            "reference": "PAY-ORD0A8WDB0Z1PR00-1234567890"
         }
         """
         serializer = PaystackVerifySerializer(data=request.data)
@@ -159,6 +178,19 @@ class OrderViewSet(viewsets.ModelViewSet):
                 order = Order.objects.get(payment_reference=reference)
                 order.payment_status = 'paid'
                 order.status = 'processing'
+                
+                # The stock held at checkout now belongs to the order
+                shortfalls = inventory.commit(order)
+                if shortfalls:
+                    import logging
+                    logger = logging.getLogger(__name__)
+                    logger.warning(f"Order {order.id} paid after its stock hold expired; short: {shortfalls}")
+                    order.notes = '\n'.join(filter(None, [
+                        order.notes,
+                        'Stock shortfall after payment: ' + ', '.join(
+                            f'variant {variant_id} x {quantity}' for variant_id, quantity in shortfalls
+                        ),
+                    ]))
                 order.save()
                 
                 return Response({
@@ -310,49 +342,47 @@ class PromoCodeViewSet(viewsets.ReadOnlyModelViewSet):
     validate: Validate a promo code
     """
     
-    queryset = PromoCode.objects.filter(is_active=True)
+    # Generated single-use codes are handed out privately, never listed
+    queryset = PromoCode.objects.filter(is_active=True, batch='')
     serializer_class = PromoCodeSerializer
     permission_classes = [AllowAny]
     lookup_field = 'code'
     
     @action(detail=True, methods=['post'])
     def validate(self, request, code=None):
-        """Validate a promo code"""
-        try:
-            promo = PromoCode.objects.get(code=code)
-            
-            if not promo.is_valid():
-                return Response(
-                    {'valid': False, 'message': 'Promo code is not valid or has expired'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            subtotal = float(request.data.get('subtotal', 0))
-            
-            if subtotal < float(promo.min_purchase):
-                return Response(
-                    {
-                        'valid': False,
-                        'message': f'Minimum purchase of {promo.min_purchase} required'
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Calculate discount
-            if promo.discount_type == 'percentage':
-                discount = subtotal * (float(promo.discount_value) / 100)
-            else:
-                discount = float(promo.discount_value)
-            
-            serializer = self.get_serializer(promo)
-            return Response({
-                'valid': True,
-                'promo': serializer.data,
-                'discount_amount': discount
-            })
-            
-        except PromoCode.DoesNotExist:
+        """Validate a promo code against a subtotal (no database query for campaign codes; see promo_rules)"""
+        rule = promo_rules.lookup(code)
+        if rule is None:
             return Response(
                 {'valid': False, 'message': 'Promo code not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        
+        if not rule.is_valid():
+            return Response(
+                {'valid': False, 'message': 'Promo code is not valid or has expired'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = PromoValidateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {'valid': False, 'message': serializer.errors['subtotal'][0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        subtotal = pricing.to_minor(serializer.validated_data['subtotal'])
+        
+        if subtotal < rule.min_purchase:
+            return Response(
+                {
+                    'valid': False,
+                    'message': f"Minimum purchase of {rule.data['min_purchase']} required"
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'valid': True,
+            'promo': {**rule.data, 'is_valid': True},
+            'discount_amount': float(pricing.from_minor(rule.discount(subtotal)))
+        })
@@ -9,3 +9,10 @@ class ProductCollectionAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description']
     prepopulated_fields = {'slug': ('title',)}
     ordering = ['order', '-created_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_product_count()
+    
+    @admin.display(description='Products', ordering='active_product_count')
+    def product_count(self, obj):
+        return obj.product_count
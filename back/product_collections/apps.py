@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProductCollectionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'product_collections'
+    
+    def ready(self):
+        import product_collections.signals
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_collections', '0002_remove_productcollection_products'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productcollection',
+            index=models.Index(fields=['updated_at'], name='product_col_updated_7b8b84_idx'),
+        ),
+    ]
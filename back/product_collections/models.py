@@ -1,8 +1,21 @@
 from django.db import models
+from django.db.models import Count, Q
 from django.utils.text import slugify
 from products.models import Product
 
 
+class ProductCollectionQuerySet(models.QuerySet):
+    def with_product_count(self):
+        """Annotate active product counts in the same query (see product_count)"""
+        queryset = self.annotate(
+            active_product_count=Count('collection_products', filter=Q(collection_products__is_active=True))
+        )
+        # Meta.ordering is not applied to GROUP BY queries
+        if not queryset.query.order_by:
+            queryset = queryset.order_by(*self.model._meta.ordering)
+        return queryset
+
+
 class ProductCollection(models.Model):
     """Product collections (e.g., Prada, YSL, Dior - luxury brands)"""
     
@@ -20,8 +33,13 @@ class ProductCollection(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    objects = ProductCollectionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', '-created_at']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
         
     def __str__(self):
         return self.title
@@ -33,4 +51,7 @@ class ProductCollection(models.Model):
     
     @property
     def product_count(self):
+        # Annotated by ProductCollectionQuerySet.with_product_count()
+        if hasattr(self, 'active_product_count'):
+            return self.active_product_count
         return self.collection_products.filter(is_active=True).count()
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, pre_delete, post_save, post_delete
+from django.dispatch import receiver
+from config import cache as api_cache
+from products.models import Product
+from products.signals import refresh_products
+from .models import ProductCollection
+
+
+@receiver(pre_save, sender=ProductCollection)
+def remember_collection_slug(sender, instance, **kwargs):
+    """Note the stored slug so a rename also purges the old URL"""
+    instance._previous_slug = ProductCollection.objects.filter(pk=instance.pk).values_list(
+        'slug', flat=True
+    ).first()
+
+
+@receiver(pre_delete, sender=ProductCollection)
+def remember_collection_products(sender, instance, **kwargs):
+    """Note the products before the delete unlinks them"""
+    instance._product_ids = list(
+        Product.objects.filter(collection_id=instance.pk).values_list('pk', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=ProductCollection)
+def collection_changed(sender, instance, **kwargs):
+    """
+    Purge cached collection responses, and refresh its products since their
+    detail pages and documents embed the collection name and slug (this also
+    bumps their updated_at, for ETags / Last-Modified)
+    """
+    tags = {api_cache.CATALOG, api_cache.collection_tag(instance.slug)}
+    previous_slug = getattr(instance, '_previous_slug', None)
+    if previous_slug:
+        tags.add(api_cache.collection_tag(previous_slug))
+    product_ids = getattr(instance, '_product_ids', None)
+    if product_ids is None:
+        product_ids = list(Product.objects.filter(collection_id=instance.pk).values_list('pk', flat=True))
+    
+    def flush():
+        api_cache.invalidate(*tags)
+        refresh_products(product_ids, changed_models=[ProductCollection])
+    transaction.on_commit(flush)
@@ -1,35 +1,94 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
+from django.db.models import Count, Max
+from config.cache import cached_response, collection_tag, CATALOG
+from config.conditional import conditional_get
+from products import cards
+from products.models import Product
+from products.serializers import ProductListSerializer
 from .models import ProductCollection
 from .serializers import CollectionListSerializer, CollectionDetailSerializer
 
 
-@method_decorator(cache_page(60 * 15), name='list')  # Cache list for 15 minutes
-@method_decorator(cache_page(60 * 30), name='retrieve')  # Cache detail for 30 minutes
+def collections_state(request, **kwargs):
+    """Validators for collection lists, which also show active product counts"""
+    collections = ProductCollection.objects.aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    products = Product.objects.aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    stamps = [stamp for stamp in (collections['last_modified'], products['last_modified']) if stamp]
+    return max(stamps, default=None), [collections['count'], products['count']]
+
+
+def collection_state(request, slug=None):
+    """Validators for one collection and the products it embeds"""
+    state = ProductCollection.objects.filter(slug=slug, is_active=True).annotate(
+        products_modified=Max('collection_products__updated_at'),
+        products_count=Count('collection_products'),
+    ).values('updated_at', 'products_modified', 'products_count').first()
+    if state is None:
+        return None
+    stamps = [stamp for stamp in (state['updated_at'], state['products_modified']) if stamp]
+    return max(stamps), [state['products_count']]
+
+
 class CollectionViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing collections.
     
     list: Get all collections
-    retrieve: Get a single collection by slug
+    retrieve: Get a single collection by slug (header only)
+    products: Get a collection's products (cursor-paginated, sortable)
     featured: Get featured collections
     """
     
-    queryset = ProductCollection.objects.filter(is_active=True).prefetch_related('collection_products')
+    queryset = ProductCollection.objects.filter(is_active=True).with_product_count()
     lookup_field = 'slug'
+    # Product sorting for the products action (OrderingFilter)
+    ordering_fields = ['price', 'created_at', 'rating_average', 'name']
+    ordering = ['-created_at']
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return CollectionDetailSerializer
         return CollectionListSerializer
     
+    @conditional_get(collections_state)
+    @cached_response([CATALOG], namespace='collections')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional_get(collection_state)
+    @cached_response(
+        lambda request, slug=None: [CATALOG, collection_tag(slug)], namespace='collections'
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=False, methods=['get'])
-    @method_decorator(cache_page(60 * 30))  # Cache for 30 minutes
+    @conditional_get(collections_state)
+    @cached_response([CATALOG], namespace='collections')
     def featured(self, request):
         """Get featured collections"""
         featured = self.queryset.filter(is_featured=True)[:6]
         serializer = CollectionListSerializer(featured, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    @conditional_get(collection_state)
+    @cached_response(
+        lambda request, slug=None: [CATALOG, collection_tag(slug)], namespace='collections'
+    )
+    def products(self, request, slug=None):
+        """Get the collection's active products, newest first (?ordering=price, -rating_average ...)"""
+        collection_id = ProductCollection.objects.filter(slug=slug, is_active=True).values_list(
+            'pk', flat=True
+        ).first()
+        if collection_id is None:
+            return Response({'detail': 'Not found.'}, status=404)
+        
+        products = Product.objects.filter(collection_id=collection_id, is_active=True)
+        products = filters.OrderingFilter().filter_queryset(request, products, self)
+        # Cards straight from values() rows (see products.cards)
+        fields = ProductListSerializer.select_fields()
+        page = self.paginate_queryset(cards.values_queryset(products, fields))
+        return self.get_paginated_response(cards.render(page, fields))
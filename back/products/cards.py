@@ -0,0 +1,86 @@
+"""
+Product cards rendered straight from values() rows.
+
+ProductListSerializer builds a model instance per row, runs method fields
+and follows collection.title / collection.slug through attribute access; for
+list pages, featured strips and search results that dominates the request.
+This renderer selects just the card columns (collection fields through the
+join, the denormalized primary image) and formats them with the same field
+classes the serializer uses, so the output is identical. Fields that need
+child rows (gallery, sizes, accords) still go through the serializer.
+
+products/tests.py checks both paths produce the same JSON for every field
+selection; benchmark_product_cards measures their throughput.
+"""
+from rest_framework import serializers
+
+# Card field -> values() column(s) it is rendered from
+SOURCES = {
+    'id': ['id'],
+    'name': ['name'],
+    'slug': ['slug'],
+    'price': ['price'],
+    'image': ['primary_image_url'],
+    'badge': ['badge'],
+    'is_bestseller': ['is_bestseller'],
+    'collection_name': ['collection__title'],
+    'collection_slug': ['collection__slug'],
+    'description': ['description'],
+    'rating': ['rating_average', 'rating_count'],
+}
+
+# Matches the representation of Product.price in ProductListSerializer
+_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+# A source='collection.title' field is left out when there is no collection
+SKIP = object()
+
+
+def _related_text(value):
+    return SKIP if value is None else str(value)
+
+
+RENDERERS = {
+    'id': lambda row: str(row['id']),
+    'name': lambda row: str(row['name']),
+    'slug': lambda row: str(row['slug']),
+    'price': lambda row: _price.to_representation(row['price']),
+    'image': lambda row: row['primary_image_url'] or None,
+    'badge': lambda row: str(row['badge']),
+    'is_bestseller': lambda row: bool(row['is_bestseller']),
+    'collection_name': lambda row: _related_text(row['collection__title']),
+    'collection_slug': lambda row: _related_text(row['collection__slug']),
+    'description': lambda row: str(row['description']),
+    'rating': lambda row: {'average': float(row['rating_average']), 'count': row['rating_count']},
+}
+
+
+def can_render(fields):
+    """Whether every requested field can be rendered from values() rows"""
+    return all(name in RENDERERS for name in fields)
+
+
+def values_queryset(queryset, fields):
+    """
+    values() rows carrying the card columns plus the ordering columns and pk,
+    so keyset pagination can read cursor positions from the rows
+    """
+    ordering = [
+        name.lstrip('-') for name in (queryset.query.order_by or queryset.model._meta.ordering)
+        if isinstance(name, str)
+    ]
+    columns = ['pk', *ordering, *(column for name in fields for column in SOURCES[name])]
+    return queryset.prefetch_related(None).values(*dict.fromkeys(columns))
+
+
+def render(rows, fields):
+    """Card dicts (fields in the given order) for values() rows"""
+    renderers = [(name, RENDERERS[name]) for name in fields]
+    cards = []
+    for row in rows:
+        card = {name: renderer(row) for name, renderer in renderers}
+        if SKIP in card.values():
+            card = {name: value for name, value in card.items() if value is not SKIP}
+        cards.append(card)
+    return cards
@@ -0,0 +1,62 @@
+"""
+Materialized product detail documents.
+
+ProductDetailSerializer output (gallery, accords, sizes, ritual, rating ...)
+is rendered once per change and stored in ProductDocument, so a detail
+request is a single primary-key read of a JSON column with no model
+instances, prefetches or Python-side grouping. Documents are rebuilt from the
+product refresh pipeline (products.signals.refresh_products) whenever the
+product, any of its child rows or its collection changes; inactive products
+have no document.
+"""
+from django.db import transaction
+from .models import Product, ProductDocument
+from .serializers import ProductDetailSerializer
+
+BATCH_SIZE = 200
+
+
+def detail_queryset():
+    fields = ProductDetailSerializer.select_fields()
+    return Product.objects.filter(is_active=True).select_related('collection').prefetch_related(
+        *ProductDetailSerializer.prefetch_for(fields)
+    )
+
+
+def render(product_ids):
+    """{pk: detail document} for the active products among product_ids"""
+    products = list(detail_queryset().filter(pk__in=product_ids))
+    # One serializer for the batch, so its fields are built once rather than per product
+    data = ProductDetailSerializer(products, many=True).data
+    return {product.pk: document for product, document in zip(products, data)}
+
+
+def refresh(product_ids):
+    """Re-render the documents of the given products"""
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+    documents = render(product_ids)
+    with transaction.atomic():
+        ProductDocument.objects.filter(pk__in=product_ids - set(documents)).delete()
+        ProductDocument.objects.bulk_create(
+            [ProductDocument(product_id=pk, document=data) for pk, data in documents.items()],
+            update_conflicts=True, unique_fields=['product'], update_fields=['document', 'updated_at'],
+        )
+    return len(documents)
+
+
+def rebuild(batch_size=BATCH_SIZE):
+    """Render every active product's document from scratch; returns the count"""
+    with transaction.atomic():
+        ProductDocument.objects.exclude(product__is_active=True).delete()
+        product_ids = list(Product.objects.filter(is_active=True).values_list('pk', flat=True))
+        count = 0
+        for start in range(0, len(product_ids), batch_size):
+            count += refresh(product_ids[start:start + batch_size])
+    return count
+
+
+def get(pk):
+    """Stored document for a product, or None if it has not been built"""
+    return ProductDocument.objects.filter(pk=pk).values_list('document', flat=True).first()
@@ -0,0 +1,128 @@
+"""
+Streaming catalog export (NDJSON / CSV) for marketplace feeds and prerendering.
+
+Products are walked with QuerySet.iterator(chunk_size), which runs the
+prefetch_related lookups once per chunk, so memory stays flat however large
+the catalog is and every chunk costs the same handful of queries. Records are
+built from model attributes directly rather than through the DRF serializers.
+"""
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Product
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+CHUNK_SIZE = 500
+
+EXPORT_PREFETCH = ['images', 'variants', 'notes', 'ingredients']
+
+CSV_FIELDS = [
+    'id', 'slug', 'name', 'description', 'price', 'badge',
+    'is_featured', 'is_bestseller', 'rating_average', 'rating_count',
+    'collection_slug', 'collection_name', 'image', 'gallery',
+    'top_notes', 'heart_notes', 'base_notes', 'ingredients',
+    'variants', 'updated_at',
+]
+
+# Separators of the older CSV layout, still accepted by products.importer;
+# list cells are now written as JSON, which any note or label text survives
+CSV_LIST_SEPARATOR = '|'
+CSV_VARIANT_SEPARATOR = ':'
+
+
+def export_queryset():
+    return Product.objects.filter(is_active=True).select_related('collection').prefetch_related(
+        *EXPORT_PREFETCH
+    ).order_by('pk')
+
+
+def product_record(product):
+    """Plain dict for one product; children must already be prefetched"""
+    collection = product.collection
+    notes = list(product.notes.all())
+    return {
+        'id': product.id,
+        'slug': product.slug,
+        'name': product.name,
+        'description': product.description,
+        'story': product.story,
+        'price': product.price,
+        'badge': product.badge,
+        'is_featured': product.is_featured,
+        'is_bestseller': product.is_bestseller,
+        'rating': {'average': float(product.rating_average), 'count': product.rating_count},
+        'collection_slug': collection.slug if collection else None,
+        'collection_name': collection.title if collection else None,
+        'image': product.primary_image_url or None,
+        'gallery': [image.image_url for image in product.images.all()],
+        'accords': {
+            note_type: [note.name for note in notes if note.note_type == note_type]
+            for note_type in ('top', 'heart', 'base')
+        },
+        'ingredients': [ingredient.name for ingredient in product.ingredients.all()],
+        'sizes': [
+            {
+                'id': variant.id,
+                'label': variant.label,
+                'volume': variant.volume,
+                'price': variant.price,
+                'sku': variant.sku,
+                'stock': variant.stock,
+                'is_available': variant.is_available,
+            }
+            for variant in product.variants.all()
+        ],
+        'created_at': product.created_at,
+        'updated_at': product.updated_at,
+    }
+
+
+def iter_records(queryset=None, chunk_size=CHUNK_SIZE):
+    queryset = export_queryset() if queryset is None else queryset
+    for product in queryset.iterator(chunk_size=chunk_size):
+        yield product_record(product)
+
+
+def _json_cell(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':'))
+
+
+def csv_row(record):
+    return [
+        record['id'], record['slug'], record['name'], record['description'],
+        record['price'], record['badge'], record['is_featured'], record['is_bestseller'],
+        record['rating']['average'], record['rating']['count'],
+        record['collection_slug'] or '', record['collection_name'] or '',
+        record['image'] or '', _json_cell(record['gallery']),
+        _json_cell(record['accords']['top']), _json_cell(record['accords']['heart']),
+        _json_cell(record['accords']['base']),
+        _json_cell(record['ingredients']),
+        _json_cell([
+            {key: size[key] for key in ('sku', 'label', 'volume', 'price', 'stock')}
+            for size in record['sizes']
+        ]),
+        record['updated_at'].isoformat(),
+    ]
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def render(records, fmt):
+    """Yield the export line by line in the given format"""
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(CSV_FIELDS)
+        for record in records:
+            yield writer.writerow(csv_row(record))
+    else:
+        for record in records:
+            yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
@@ -0,0 +1,176 @@
+"""
+Faceted product filtering.
+
+Every facet is a query parameter accepting comma-separated values:
+
+    collection=velvet-evenings,atelier-collection
+    note=Velvet rose,Smoked amber        note_type=base
+    price=0-50,50-100                    volume=50ml
+    in_stock=true                        rating=4-5
+
+Values of one facet are OR-ed, different facets are AND-ed. Counts are
+disjunctive: a facet's counts apply every *other* facet's filter, so a
+shopper can see how many results each extra value would add. Each facet is
+counted with one grouped aggregate query, whatever the number of values.
+"""
+from decimal import Decimal
+from django.db.models import Case, Count, Exists, OuterRef, Q, Value, When, CharField
+from .models import FragranceNote, ProductVariant
+
+# (key, lower bound inclusive, upper bound exclusive or None)
+PRICE_BUCKETS = [
+    ('0-50', Decimal('0'), Decimal('50')),
+    ('50-100', Decimal('50'), Decimal('100')),
+    ('100-200', Decimal('100'), Decimal('200')),
+    ('200+', Decimal('200'), None),
+]
+
+RATING_BANDS = [
+    ('4-5', Decimal('4'), None),
+    ('3-4', Decimal('3'), Decimal('4')),
+    ('2-3', Decimal('2'), Decimal('3')),
+    ('0-2', Decimal('0'), Decimal('2')),
+]
+
+FACETS = ['collection', 'note', 'note_type', 'price', 'volume', 'in_stock', 'rating']
+
+# Most common note names returned in the note facet
+MAX_NOTE_VALUES = 50
+
+
+def parse(params):
+    """Selected values per facet from request query params"""
+    selected = {}
+    for facet in FACETS:
+        raw = params.get(facet)
+        if raw:
+            values = [value.strip() for value in raw.split(',') if value.strip()]
+            if values:
+                selected[facet] = values
+    return selected
+
+
+def _range_q(field, buckets, keys):
+    condition = Q()
+    for key, lower, upper in buckets:
+        if key in keys:
+            bucket = Q(**{f'{field}__gte': lower})
+            if upper is not None:
+                bucket &= Q(**{f'{field}__lt': upper})
+            condition |= bucket
+    return condition
+
+
+def _bucket_case(field, buckets):
+    whens = []
+    for key, lower, upper in buckets:
+        bucket = Q(**{f'{field}__gte': lower})
+        if upper is not None:
+            bucket &= Q(**{f'{field}__lt': upper})
+        whens.append(When(bucket, then=Value(key)))
+    return Case(*whens, default=Value(None), output_field=CharField())
+
+
+def _in_stock():
+    return Exists(ProductVariant.objects.filter(product=OuterRef('pk'), stock__gt=0, is_available=True))
+
+
+def facet_filter(facet, values, selected):
+    """Q object for one facet; multi-valued relations use EXISTS to avoid duplicate rows"""
+    if facet == 'collection':
+        return Q(collection__slug__in=values)
+    if facet == 'note':
+        notes = FragranceNote.objects.filter(product=OuterRef('pk'), name__in=values)
+        if 'note_type' in selected:
+            # note=Oud&note_type=base means Oud as a base note
+            notes = notes.filter(note_type__in=selected['note_type'])
+        return Q(Exists(notes))
+    if facet == 'note_type':
+        if 'note' in selected:
+            return Q()  # combined into the note filter
+        return Q(Exists(FragranceNote.objects.filter(product=OuterRef('pk'), note_type__in=values)))
+    if facet == 'price':
+        return _range_q('price', PRICE_BUCKETS, values)
+    if facet == 'volume':
+        return Q(Exists(ProductVariant.objects.filter(product=OuterRef('pk'), volume__in=values)))
+    if facet == 'in_stock':
+        wanted = {value.lower() for value in values}
+        if wanted == {'true'}:
+            return Q(_in_stock())
+        if wanted == {'false'}:
+            return ~Q(_in_stock())
+        return Q()
+    if facet == 'rating':
+        return _range_q('rating_average', RATING_BANDS, values)
+    return Q()
+
+
+def apply_filters(queryset, params, exclude=None):
+    selected = parse(params)
+    for facet, values in selected.items():
+        if facet != exclude:
+            queryset = queryset.filter(facet_filter(facet, values, selected))
+    return queryset
+
+
+def facet_counts(queryset, params):
+    """Per-value result counts for every facet, one grouped query each"""
+    selected = parse(params)
+
+    def base(facet):
+        narrowed = dict(selected)
+        narrowed.pop(facet, None)
+        if facet == 'note':
+            narrowed.pop('note_type', None)
+        qs = queryset
+        for other, values in narrowed.items():
+            qs = qs.filter(facet_filter(other, values, narrowed))
+        return qs.order_by()
+
+    counts = {}
+
+    rows = base('collection').exclude(collection__isnull=True).values(
+        'collection__slug', 'collection__title'
+    ).annotate(count=Count('pk')).order_by('collection__title')
+    counts['collection'] = [
+        {'value': row['collection__slug'], 'label': row['collection__title'], 'count': row['count']}
+        for row in rows
+    ]
+
+    rows = base('note').exclude(notes__isnull=True).values('notes__name').annotate(
+        count=Count('pk', distinct=True)
+    ).order_by('-count', 'notes__name')[:MAX_NOTE_VALUES]
+    counts['note'] = [{'value': row['notes__name'], 'count': row['count']} for row in rows]
+
+    rows = base('note_type').exclude(notes__isnull=True).values('notes__note_type').annotate(
+        count=Count('pk', distinct=True)
+    ).order_by('notes__note_type')
+    counts['note_type'] = [{'value': row['notes__note_type'], 'count': row['count']} for row in rows]
+
+    rows = base('price').annotate(bucket=_bucket_case('price', PRICE_BUCKETS)).values('bucket').annotate(
+        count=Count('pk')
+    ).order_by()
+    by_bucket = {row['bucket']: row['count'] for row in rows}
+    counts['price'] = [{'value': key, 'count': by_bucket.get(key, 0)} for key, _, _ in PRICE_BUCKETS]
+
+    rows = base('volume').exclude(variants__isnull=True).values('variants__volume').annotate(
+        count=Count('pk', distinct=True)
+    ).order_by('variants__volume')
+    counts['volume'] = [{'value': row['variants__volume'], 'count': row['count']} for row in rows]
+
+    stock = base('in_stock').aggregate(
+        in_stock=Count('pk', filter=Q(_in_stock())),
+        total=Count('pk'),
+    )
+    counts['in_stock'] = [
+        {'value': 'true', 'count': stock['in_stock']},
+        {'value': 'false', 'count': stock['total'] - stock['in_stock']},
+    ]
+
+    rows = base('rating').annotate(band=_bucket_case('rating_average', RATING_BANDS)).values('band').annotate(
+        count=Count('pk')
+    ).order_by()
+    by_band = {row['band']: row['count'] for row in rows}
+    counts['rating'] = [{'value': key, 'count': by_band.get(key, 0)} for key, _, _ in RATING_BANDS]
+
+    return counts
@@ -0,0 +1,410 @@
+"""
+Bulk, idempotent catalog import.
+
+Feeds are JSON (a list, or {"products": [...]}), NDJSON or CSV in the shape
+written by products.export (the load_products fixtures use the same keys).
+Records are processed in batches: each batch loads the existing products and
+child rows with one query per table, diffs them against the feed and applies
+the difference with bulk_create / bulk_update / batched deletes. The whole
+import runs in one transaction, and derived data (primary images, search
+index, documents, similarities, caches) is refreshed once on commit, in
+batches, with a single similarity rebuild for large imports.
+
+Only keys present in a record are synced, so a partial feed (e.g. prices
+and stock only) leaves everything else alone, and re-running an unchanged
+feed writes nothing.
+"""
+import csv
+import json
+from collections import Counter, defaultdict
+from itertools import islice, zip_longest
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from product_collections.models import ProductCollection
+from .models import (
+    Product, ProductImage, ProductVariant, FragranceNote,
+    ProductHighlight, RitualStep, Ingredient
+)
+from . import keys
+from .export import CSV_LIST_SEPARATOR, CSV_VARIANT_SEPARATOR
+from .signals import refresh_products
+
+BATCH_SIZE = 1000
+
+PRODUCT_FIELDS = [
+    'name', 'slug', 'description', 'story', 'price', 'badge',
+    'is_featured', 'is_bestseller', 'is_active', 'rating_average', 'rating_count',
+]
+
+# Child table -> (model, synced fields, natural key or None to match by position)
+CHILDREN = {
+    'images': (ProductImage, ['image_url', 'alt_text', 'order', 'is_primary'], None),
+    'notes': (FragranceNote, ['note_type', 'name', 'order'], None),
+    'highlights': (ProductHighlight, ['title', 'description', 'order'], None),
+    'ritual_steps': (RitualStep, ['step', 'order'], None),
+    'ingredients': (Ingredient, ['name', 'order'], None),
+    'variants': (ProductVariant, ['label', 'volume', 'price', 'stock', 'is_available'], 'sku'),
+}
+
+FEED_FORMATS = ['json', 'ndjson', 'csv']
+
+
+class CatalogImportError(ValueError):
+    pass
+
+
+# Feed parsing
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 't', 'yes', 'y')
+
+
+def _split(value):
+    return [item for item in (value or '').split(CSV_LIST_SEPARATOR) if item]
+
+
+def _json_list(row, key):
+    """A JSON list cell (as exported), or None when the cell uses the older separators"""
+    value = (row.get(key) or '').strip()
+    if not value.startswith('['):
+        return None
+    try:
+        items = json.loads(value)
+    except ValueError as exc:
+        raise CatalogImportError(f'{row.get("id") or row.get("name")}: bad {key} ({exc})')
+    if not isinstance(items, list):
+        raise CatalogImportError(f'{row.get("id") or row.get("name")}: {key} must be a list')
+    return items
+
+
+def _list_cell(row, key):
+    items = _json_list(row, key)
+    return _split(row.get(key)) if items is None else [str(item) for item in items]
+
+
+def _variants_cell(row):
+    items = _json_list(row, 'variants')
+    if items is not None:
+        if not all(isinstance(item, dict) and 'sku' in item for item in items):
+            raise CatalogImportError(f'{row.get("id") or row.get("name")}: every variant needs a sku')
+        return items
+    sizes = []
+    for item in _split(row['variants']):
+        parts = item.split(CSV_VARIANT_SEPARATOR)
+        if len(parts) != 5:
+            raise CatalogImportError(f'{row.get("id") or row.get("name")}: bad variant "{item}"')
+        sku, label, volume, price, stock = parts
+        sizes.append({'sku': sku, 'label': label, 'volume': volume, 'price': price, 'stock': stock})
+    return sizes
+
+
+def csv_record(row):
+    """
+    Export-style record from one CSV row; empty optional columns are skipped.
+    List cells are JSON arrays, or (older files) |-separated with variants as
+    sku:label:volume:price:stock.
+    """
+    record = {key: row[key] for key in ('id', 'slug', 'name', 'price') if row.get(key)}
+    for key in ('description', 'story', 'badge', 'collection_slug'):
+        if key in row:
+            record[key] = row[key]
+    for key in ('is_featured', 'is_bestseller', 'is_active'):
+        if row.get(key):
+            record[key] = _bool(row[key])
+    if row.get('rating_average') or row.get('rating_count'):
+        record['rating'] = {'average': row.get('rating_average') or 0, 'count': row.get('rating_count') or 0}
+    if 'gallery' in row:
+        record['gallery'] = _list_cell(row, 'gallery')
+    if any(f'{note_type}_notes' in row for note_type in ('top', 'heart', 'base')):
+        record['accords'] = {
+            note_type: _list_cell(row, f'{note_type}_notes')
+            for note_type in ('top', 'heart', 'base')
+        }
+    if 'ingredients' in row:
+        record['ingredients'] = _list_cell(row, 'ingredients')
+    if 'variants' in row:
+        record['sizes'] = _variants_cell(row)
+    return record
+
+
+def read_feed(handle, fmt):
+    """Yield records from an open text file"""
+    if fmt == 'csv':
+        for row in csv.DictReader(handle):
+            yield csv_record(row)
+    elif fmt == 'ndjson':
+        for number, line in enumerate(handle, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as exc:
+                    raise CatalogImportError(f'Line {number}: {exc}')
+    elif fmt == 'json':
+        try:
+            data = json.load(handle)
+        except ValueError as exc:
+            raise CatalogImportError(str(exc))
+        yield from data['products'] if isinstance(data, dict) else data
+    else:
+        raise CatalogImportError(f'Unsupported feed format: {fmt}')
+
+
+def guess_format(path):
+    extension = path.rsplit('.', 1)[-1].lower()
+    return 'ndjson' if extension == 'jsonl' else extension
+
+
+# Normalization
+
+def _clean(model, field_name, value, label):
+    try:
+        return model._meta.get_field(field_name).to_python(value)
+    except ValidationError as exc:
+        raise CatalogImportError(f'{label}: {field_name}: {"; ".join(exc.messages)}')
+
+
+def _child_rows(record):
+    """Desired child rows per table, only for tables present in the record"""
+    rows = {}
+    gallery = record.get('gallery', record.get('images'))
+    if gallery is not None:
+        rows['images'] = []
+        for index, image in enumerate(gallery):
+            image = image if isinstance(image, dict) else {'image_url': image}
+            rows['images'].append({
+                'image_url': image['image_url'],
+                'alt_text': image.get('alt_text', ''),
+                'order': index,
+                'is_primary': image.get('is_primary', index == 0),
+            })
+    if 'accords' in record:
+        rows['notes'] = [
+            {'note_type': note_type, 'name': name, 'order': index}
+            for note_type in ('top', 'heart', 'base')
+            for index, name in enumerate(record['accords'].get(note_type, []))
+        ]
+    if 'highlights' in record:
+        rows['highlights'] = [
+            {'title': item['title'], 'description': item['description'], 'order': index}
+            for index, item in enumerate(record['highlights'])
+        ]
+    ritual = record.get('ritual', record.get('ritual_steps'))
+    if ritual is not None:
+        rows['ritual_steps'] = [{'step': step, 'order': index} for index, step in enumerate(ritual)]
+    if 'ingredients' in record:
+        rows['ingredients'] = [{'name': name, 'order': index} for index, name in enumerate(record['ingredients'])]
+    sizes = record.get('sizes', record.get('variants'))
+    if sizes is not None:
+        rows['variants'] = [
+            {
+                'sku': size['sku'],
+                'label': size['label'],
+                'volume': size['volume'],
+                'price': size['price'],
+                'stock': size.get('stock', 0),
+                'is_available': _bool(size.get('is_available', True)),
+            }
+            for size in sizes
+        ]
+    return rows
+
+
+def normalize(record, collections):
+    """(product id, product field values, child rows) for one feed record"""
+    name = record.get('name')
+    slug = record.get('slug') or (slugify(name) if name else None)
+    product_id = record.get('id') or slug
+    if not product_id:
+        raise CatalogImportError(f'Record without id, slug or name: {record!r:.80}')
+
+    values = {}
+    source = dict(record)
+    if 'rating' in record:
+        source['rating_average'] = record['rating']['average']
+        source['rating_count'] = record['rating']['count']
+    for field in PRODUCT_FIELDS:
+        if field in source:
+            values[field] = _clean(Product, field, source[field], product_id)
+
+    if 'collection_slug' in record or 'collection' in record:
+        collection_key = record.get('collection_slug') or record.get('collection')
+        if collection_key and collection_key not in collections:
+            raise CatalogImportError(f'{product_id}: unknown collection "{collection_key}"')
+        values['collection_id'] = collections.get(collection_key) if collection_key else None
+
+    children = {}
+    for table, rows in _child_rows(record).items():
+        model, fields, key = CHILDREN[table]
+        children[table] = [
+            {field: _clean(model, field, row[field], product_id) for field in ([key] if key else []) + fields}
+            for row in rows
+        ]
+    return product_id, values, children
+
+
+# Diff and apply
+
+def _row_values(obj, fields):
+    return tuple(getattr(obj, field) for field in fields)
+
+
+def _sync_products(batch, stats, changed):
+    existing = Product.objects.in_bulk([product_id for product_id, _, _ in batch])
+    now = timezone.now()
+    creates, updates, update_fields = [], [], set()
+    for product_id, values, _ in batch:
+        product = existing.get(product_id)
+        if product is None:
+            missing = {'name', 'price'} - set(values)
+            if missing:
+                raise CatalogImportError(f'{product_id}: new product needs {", ".join(sorted(missing))}')
+            values.setdefault('slug', slugify(values['name']))
+            creates.append(Product(id=product_id, **values))
+            stats['inserted'] += 1
+            changed[Product].add(product_id)
+            continue
+        diff = [field for field, value in values.items() if getattr(product, field) != value]
+        if diff:
+            for field in diff:
+                setattr(product, field, values[field])
+            product.updated_at = now
+            updates.append(product)
+            update_fields.update(diff)
+            changed[Product].add(product_id)
+    Product.objects.bulk_create(creates, batch_size=BATCH_SIZE)
+    if updates:
+        Product.objects.bulk_update(updates, [*update_fields, 'updated_at'], batch_size=BATCH_SIZE)
+
+
+def _delete(model, pks):
+    pks = list(pks)
+    for start in range(0, len(pks), BATCH_SIZE):
+        model.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).delete()
+
+
+def _sync_children(table, targets, changed):
+    """Make each product's rows of one child table match the feed"""
+    model, fields, key = CHILDREN[table]
+    queryset = model.objects.filter(product_id__in=targets)
+    if key:
+        # Natural keys are unique across products, so a key may move between them
+        keys = {row[key] for rows in targets.values() for row in rows}
+        queryset = model.objects.filter(product_id__in=targets) | model.objects.filter(**{f'{key}__in': keys})
+    current = defaultdict(list)
+    by_key = {}
+    for obj in queryset.order_by('pk'):
+        current[obj.product_id].append(obj)
+        if key:
+            by_key[getattr(obj, key)] = obj
+
+    creates, updates, deletes = [], [], []
+    for product_id, rows in targets.items():
+        objs = current[product_id]
+        if key:
+            # Rows whose key is gone from the feed; keys moved to another product are kept
+            pairs = [(obj, None) for obj in objs if getattr(obj, key) not in keys]
+            pairs += [(by_key.get(row[key]), row) for row in rows]
+        else:
+            existing_rows = sorted(_row_values(obj, fields) for obj in objs)
+            if existing_rows == sorted(tuple(row[field] for field in fields) for row in rows):
+                continue
+            pairs = list(zip_longest(objs, rows))
+
+        touched = False
+        for obj, row in pairs:
+            if row is None:
+                deletes.append(obj.pk)
+                touched = True
+            elif obj is None:
+                creates.append(model(product_id=product_id, **row))
+                touched = True
+            elif obj.product_id != product_id or _row_values(obj, fields) != tuple(row[field] for field in fields):
+                if obj.product_id != product_id:
+                    changed[model].add(obj.product_id)
+                    obj.product_id = product_id
+                for field in fields:
+                    setattr(obj, field, row[field])
+                updates.append(obj)
+                touched = True
+        if touched:
+            changed[model].add(product_id)
+
+    _delete(model, deletes)
+    model.objects.bulk_update(updates, [*fields, 'product'] if key else fields, batch_size=BATCH_SIZE)
+    model.objects.bulk_create(creates, batch_size=BATCH_SIZE)
+
+
+def _collections():
+    """Collection pk by slug and by title (the load_products fixtures use titles)"""
+    keys = {}
+    for pk, slug, title in ProductCollection.objects.values_list('pk', 'slug', 'title'):
+        keys[title] = pk
+        keys[slug] = pk
+    return keys
+
+
+def _batches(records, size):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_catalog(records, deactivate_missing=False, dry_run=False, batch_size=BATCH_SIZE):
+    """
+    Sync the catalog with a feed and return counts: inserted, updated,
+    unchanged and (with deactivate_missing) deactivated products.
+
+    deactivate_missing hides active products that are not in the feed; they
+    are not deleted, since orders keep pointing at them.
+    """
+    stats = Counter(inserted=0, updated=0, unchanged=0, deactivated=0)
+    changed = defaultdict(set)
+    seen = set()
+    collections = _collections()
+
+    with transaction.atomic():
+        for batch in _batches(records, batch_size):
+            # A product listed twice keeps its first record
+            normalized = {}
+            for record in batch:
+                entry = normalize(record, collections)
+                if entry[0] not in seen and entry[0] not in normalized:
+                    normalized[entry[0]] = entry
+            batch = list(normalized.values())
+            seen.update(normalized)
+
+            _sync_products(batch, stats, changed)
+            for table in CHILDREN:
+                targets = {product_id: children[table] for product_id, _, children in batch if table in children}
+                if targets:
+                    _sync_children(table, targets, changed)
+
+        if deactivate_missing:
+            active = set(Product.objects.filter(is_active=True).values_list('pk', flat=True))
+            missing = list(active - seen)
+            for start in range(0, len(missing), BATCH_SIZE):
+                Product.objects.filter(pk__in=missing[start:start + BATCH_SIZE]).update(
+                    is_active=False, updated_at=timezone.now()
+                )
+            stats['deactivated'] = len(missing)
+            changed[Product].update(missing)
+
+        touched = set().union(*changed.values()) if changed else set()
+        stats['updated'] = len(touched & seen) - stats['inserted']
+        stats['unchanged'] = len(seen) - stats['inserted'] - stats['updated']
+
+        if dry_run:
+            transaction.set_rollback(True)
+        elif touched:
+            if changed[Product]:
+                # bulk_create / update() skip the signal that tracks new and hidden products
+                transaction.on_commit(keys.invalidate)
+            transaction.on_commit(lambda: refresh_products(touched, changed_models=set(changed)))
+    return stats
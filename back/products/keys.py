@@ -0,0 +1,59 @@
+"""
+Product key resolver: slug or id -> primary key without a database query.
+
+Product URLs accept either the slug or the id. Every process keeps a map of
+both keys of all active products, built with a single values_list query. A
+generation number in the shared default cache is bumped (on commit) whenever
+a product is created, deleted, renamed or (de)activated; a process rebuilds
+its map when it sees a newer generation, so resolving a key normally costs
+one cache read.
+"""
+import threading
+import time
+from django.core.cache import cache
+from .models import Product
+
+GENERATION_KEY = 'products:keys:generation'
+
+_lock = threading.Lock()
+_state = {'generation': None, 'keys': {}}
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(GENERATION_KEY, generation, None):
+            generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def _build():
+    rows = list(Product.objects.filter(is_active=True).values_list('pk', 'slug'))
+    # Slugs win over ids, as in the original slug-then-id lookup
+    keys = {slug: pk for pk, slug in rows if slug}
+    for pk, _ in rows:
+        keys.setdefault(pk, pk)
+    return keys
+
+
+def key_map():
+    generation = _generation()
+    if _state['generation'] != generation:
+        with _lock:
+            if _state['generation'] != generation:
+                _state['keys'] = _build()
+                _state['generation'] = generation
+    return _state['keys']
+
+
+def resolve(key):
+    """Primary key of the active product with this slug or id, or None"""
+    if key is None:
+        return None
+    return key_map().get(str(key))
+
+
+def invalidate():
+    """Make every process rebuild its map on its next lookup"""
+    cache.set(GENERATION_KEY, time.time_ns(), None)
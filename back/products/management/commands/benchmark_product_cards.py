@@ -0,0 +1,56 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from products import cards
+from products.serializers import ProductListSerializer
+from products.views import ProductViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        'Check the values() card renderer against ProductListSerializer (fails on any difference) '
+        'and compare their single-core throughput'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200, help='Number of products per round')
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--check-only', action='store_true', help='Skip the benchmark')
+
+    def serializer_cards(self, queryset, fields):
+        queryset = queryset.prefetch_related(*ProductListSerializer.prefetch_for(fields))
+        return ProductListSerializer(queryset, many=True, fields=fields).data
+
+    def values_cards(self, queryset, fields):
+        return cards.render(cards.values_queryset(queryset, fields), fields)
+
+    def measure(self, render, queryset, fields, rounds):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            count = len(render(queryset, fields))
+        elapsed = time.perf_counter() - start
+        return count * rounds / elapsed if elapsed else 0
+
+    def handle(self, *args, **options):
+        queryset = ProductViewSet.queryset.order_by('-created_at', '-pk')[:options['limit']]
+        # Every field selection the fast path serves
+        selections = {
+            'default': ProductListSerializer.select_fields(),
+            'include=description,rating': ProductListSerializer.select_fields(include=['description', 'rating']),
+        }
+        renderer = JSONRenderer()
+
+        for label, fields in selections.items():
+            expected = renderer.render(self.serializer_cards(queryset, fields))
+            actual = renderer.render(self.values_cards(queryset, fields))
+            if actual != expected:
+                raise CommandError(f'Card renderer output differs from ProductListSerializer ({label})')
+        self.stdout.write(self.style.SUCCESS(f'Card renderer matches ProductListSerializer ({len(selections)} field sets)'))
+        if options['check_only']:
+            return
+
+        self.stdout.write(f'{"fields":<28} {"serializer cards/s":>19} {"values cards/s":>15} {"speedup":>8}')
+        for label, fields in selections.items():
+            slow = self.measure(self.serializer_cards, queryset, fields, options['rounds'])
+            fast = self.measure(self.values_cards, queryset, fields, options['rounds'])
+            self.stdout.write(f'{label:<28} {slow:>19.0f} {fast:>15.0f} {fast / slow if slow else 0:>7.1f}x')
@@ -0,0 +1,67 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from products import keys
+from products.models import Product
+from products.serializers import ProductDetailSerializer
+from products.views import ProductViewSet
+
+
+class Command(BaseCommand):
+    help = 'Compare queries and time per product detail lookup: slug-then-id gets vs the key resolver'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=20, help='Number of products to look up')
+        parser.add_argument('--rounds', type=int, default=5)
+
+    def legacy_lookup(self, queryset, slug_or_id):
+        """The original lookup: try the slug, then the id"""
+        try:
+            return queryset.get(slug=slug_or_id)
+        except Product.DoesNotExist:
+            try:
+                return queryset.get(id=slug_or_id)
+            except Product.DoesNotExist:
+                return None
+
+    def resolver_lookup(self, queryset, slug_or_id):
+        pk = keys.resolve(slug_or_id)
+        return queryset.filter(pk=pk).first() if pk is not None else None
+
+    def measure(self, lookup, queryset, lookup_keys, rounds):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for key in lookup_keys:
+                    product = lookup(queryset, key)
+                    # Touch the prefetched relations like the detail serializer does
+                    if product is not None:
+                        list(product.images.all())
+            elapsed = time.perf_counter() - start
+        lookups = rounds * len(lookup_keys)
+        return len(queries) / lookups, elapsed * 1000 / lookups
+
+    def handle(self, *args, **options):
+        queryset = ProductViewSet.queryset.prefetch_related(
+            *ProductDetailSerializer.prefetch_for(ProductDetailSerializer.select_fields())
+        )
+        rows = list(Product.objects.filter(is_active=True).values_list('pk', 'slug')[:options['sample']])
+        if not rows:
+            self.stdout.write(self.style.WARNING('No active products to look up'))
+            return
+        keys.key_map()  # Warm the per-process map, as a running server would have
+        reset_queries()
+        
+        cases = [
+            ('by slug', [slug for _, slug in rows]),
+            ('by id', [pk for pk, _ in rows]),
+            ('unknown', [f'missing-{pk}' for pk, _ in rows]),
+        ]
+        self.stdout.write(f'{"lookup":<10} {"legacy q/req":>13} {"resolver q/req":>15} {"legacy ms":>10} {"resolver ms":>12}')
+        for label, lookup_keys in cases:
+            legacy_queries, legacy_ms = self.measure(self.legacy_lookup, queryset, lookup_keys, options['rounds'])
+            new_queries, new_ms = self.measure(self.resolver_lookup, queryset, lookup_keys, options['rounds'])
+            self.stdout.write(
+                f'{label:<10} {legacy_queries:>13.1f} {new_queries:>15.1f} {legacy_ms:>10.2f} {new_ms:>12.2f}'
+            )
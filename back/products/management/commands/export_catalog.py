@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from products import export
+
+
+class Command(BaseCommand):
+    help = 'Export the active catalog as NDJSON or CSV with constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(export.FORMATS), default='ndjson')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        records = export.iter_records(chunk_size=options['chunk_size'])
+        lines = export.render(records, options['format'])
+        
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        
+        count = 0
+        with open(options['output'], 'w', encoding='utf-8', newline='') as handle:
+            for line in lines:
+                handle.write(line)
+                count += 1
+        if options['format'] == 'csv':
+            count -= 1  # header
+        self.stdout.write(self.style.SUCCESS(f'Exported {count} products to {options["output"]}'))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from config import cache as api_cache
+
+
+class Command(BaseCommand):
+    help = 'Drop cached API responses for one or more namespaces (products, collections, announcements)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('namespaces', nargs='*', help='Namespaces to flush (default: all)')
+        parser.add_argument(
+            '--hard', action='store_true',
+            help='Clear the whole cache backend instead of versioning namespaces out',
+        )
+
+    def handle(self, *args, **options):
+        namespaces = options['namespaces'] or settings.CACHE_NAMESPACES
+        unknown = set(namespaces) - set(settings.CACHE_NAMESPACES)
+        if unknown:
+            raise CommandError(f'Unknown cache namespace(s): {", ".join(sorted(unknown))}')
+        
+        if options['hard']:
+            caches['default'].clear()
+            self.stdout.write(self.style.SUCCESS('Cleared the entire cache backend'))
+            return
+        
+        for namespace in namespaces:
+            api_cache.flush_namespace(namespace)
+            self.stdout.write(self.style.SUCCESS(f'Flushed {namespace} cache'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from products import importer
+
+
+class Command(BaseCommand):
+    help = 'Import a JSON, NDJSON or CSV catalog feed, applying only what changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Feed file (format taken from the extension unless --format is given)')
+        parser.add_argument('--format', choices=importer.FEED_FORMATS)
+        parser.add_argument('--batch-size', type=int, default=importer.BATCH_SIZE)
+        parser.add_argument(
+            '--deactivate-missing', action='store_true',
+            help='Deactivate active products that are not in the feed'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without saving them')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or importer.guess_format(options['path'])
+        if fmt not in importer.FEED_FORMATS:
+            raise CommandError(f'Cannot tell the feed format of {options["path"]}; pass --format')
+        
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as handle:
+                stats = importer.import_catalog(
+                    importer.read_feed(handle, fmt),
+                    deactivate_missing=options['deactivate_missing'],
+                    dry_run=options['dry_run'],
+                    batch_size=options['batch_size'],
+                )
+        except (OSError, importer.CatalogImportError) as exc:
+            raise CommandError(str(exc))
+        
+        prefix = 'Dry run: ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{stats["inserted"]} inserted, {stats["updated"]} updated, '
+            f'{stats["unchanged"]} unchanged, {stats["deactivated"]} deactivated'
+        ))
@@ -1,11 +1,7 @@
 from django.core.management.base import BaseCommand
-from django.utils.text import slugify
-from products.models import (
-    Product, ProductVariant, ProductHighlight, ProductImage,
-    FragranceNote, RitualStep, Ingredient
-)
+from products.importer import import_catalog
+from products.models import Product
 from product_collections.models import ProductCollection
-from decimal import Decimal
 
 
 class Command(BaseCommand):
@@ -345,118 +341,17 @@ class Command(BaseCommand):
             },
         ]
 
-        created_count = 0
-        updated_count = 0
-
-        for data in products_data:
-            # Get collection
-            collection = collections.get(data['collection'])
-            
-            # Create or update product
-            slug = slugify(data['name'])
-            product, created = Product.objects.update_or_create(
-                slug=slug,
-                defaults={
-                    'id': slug,
-                    'name': data['name'],
-                    'description': data['description'],
-                    'story': data['story'],
-                    'price': Decimal(data['price']),
-                    'collection': collection,
-                    'is_bestseller': data['is_bestseller'],
-                    'is_active': True,
-                    'rating_average': Decimal('4.7'),
-                    'rating_count': 150,
-                }
-            )
-            
-            if created:
-                created_count += 1
-                self.stdout.write(self.style.SUCCESS(f'✓ Created product: {product.name}'))
-            else:
-                updated_count += 1
-                self.stdout.write(self.style.WARNING(f'↻ Updated product: {product.name}'))
-            
-            # Create product images (gallery)
-            ProductImage.objects.filter(product=product).delete()
-            for idx, image_url in enumerate(data['gallery']):
-                ProductImage.objects.create(
-                    product=product,
-                    image_url=image_url,
-                    order=idx,
-                    is_primary=(idx == 0),
-                )
-            
-            # Create fragrance notes
-            FragranceNote.objects.filter(product=product).delete()
-            for idx, note in enumerate(data['accords']['top']):
-                FragranceNote.objects.create(
-                    product=product,
-                    note_type='top',
-                    name=note,
-                    order=idx,
-                )
-            for idx, note in enumerate(data['accords']['heart']):
-                FragranceNote.objects.create(
-                    product=product,
-                    note_type='heart',
-                    name=note,
-                    order=idx,
-                )
-            for idx, note in enumerate(data['accords']['base']):
-                FragranceNote.objects.create(
-                    product=product,
-                    note_type='base',
-                    name=note,
-                    order=idx,
-                )
-            
-            # Create ritual steps
-            RitualStep.objects.filter(product=product).delete()
-            for idx, step in enumerate(data['ritual']):
-                RitualStep.objects.create(
-                    product=product,
-                    step=step,
-                    order=idx,
-                )
-            
-            # Create ingredients
-            Ingredient.objects.filter(product=product).delete()
-            for idx, ingredient in enumerate(data['ingredients']):
-                Ingredient.objects.create(
-                    product=product,
-                    name=ingredient,
-                    order=idx,
-                )
-            
-            # Create variants
-            for variant_data in data['variants']:
-                ProductVariant.objects.update_or_create(
-                    product=product,
-                    sku=variant_data['sku'],
-                    defaults={
-                        'label': variant_data['label'],
-                        'volume': variant_data['volume'],
-                        'price': Decimal(variant_data['price']),
-                        'stock': variant_data['stock'],
-                        'is_available': True,
-                    }
-                )
-            
-            # Create highlights
-            for idx, highlight_data in enumerate(data['highlights']):
-                ProductHighlight.objects.update_or_create(
-                    product=product,
-                    title=highlight_data['title'],
-                    defaults={
-                        'description': highlight_data['description'],
-                        'order': idx + 1,
-                    }
-                )
+        # Diffed against existing rows and applied in bulk; re-running is a no-op
+        records = [
+            {**data, 'is_active': True, 'rating': {'average': '4.7', 'count': 150}}
+            for data in products_data
+        ]
+        stats = import_catalog(records)
 
         self.stdout.write(
             self.style.SUCCESS(
-                f'\n✓ Completed! Created: {created_count}, Updated: {updated_count}'
+                f'\n✓ Completed! Created: {stats["inserted"]}, Updated: {stats["updated"]}, '
+                f'Unchanged: {stats["unchanged"]}'
             )
         )
         self.stdout.write(
@@ -1,8 +1,5 @@
 from django.core.management.base import BaseCommand
-from products.models import (
-    Product, ProductImage, ProductVariant, FragranceNote,
-    ProductHighlight, RitualStep, Ingredient
-)
+from products.importer import import_catalog
 from product_collections.models import ProductCollection
 
 
@@ -12,10 +9,6 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         self.stdout.write('Populating database...')
         
-        # Clear existing data
-        Product.objects.all().delete()
-        ProductCollection.objects.all().delete()
-        
         # Create products
         products_data = [
             {
@@ -214,78 +207,19 @@ class Command(BaseCommand):
             },
         ]
         
-        for product_data in products_data:
-            # Create product
-            product = Product.objects.create(
-                id=product_data['id'],
-                name=product_data['name'],
-                description=product_data['description'],
-                story=product_data['story'],
-                price=product_data['price'],
-                is_featured=product_data.get('is_featured', False),
-                is_bestseller=product_data.get('is_bestseller', False),
-                badge=product_data.get('badge', ''),
-                rating_average=product_data.get('rating_average', 0),
-                rating_count=product_data.get('rating_count', 0),
-            )
-            
-            # Create images
-            for idx, image_url in enumerate(product_data['images']):
-                ProductImage.objects.create(
-                    product=product,
-                    image_url=image_url,
-                    order=idx,
-                    is_primary=(idx == 0)
-                )
-            
-            # Create variants
-            for variant_data in product_data['variants']:
-                ProductVariant.objects.create(
-                    product=product,
-                    label=variant_data['label'],
-                    volume=variant_data['volume'],
-                    price=variant_data['price'],
-                    sku=variant_data['sku'],
-                    stock=100,
-                    is_available=True
-                )
-            
-            # Create notes
-            for note_type, notes in product_data['notes'].items():
-                for idx, note_name in enumerate(notes):
-                    FragranceNote.objects.create(
-                        product=product,
-                        note_type=note_type,
-                        name=note_name,
-                        order=idx
-                    )
-            
-            # Create highlights
-            for idx, highlight in enumerate(product_data['highlights']):
-                ProductHighlight.objects.create(
-                    product=product,
-                    title=highlight['title'],
-                    description=highlight['description'],
-                    order=idx
-                )
-            
-            # Create ritual steps
-            for idx, step in enumerate(product_data['ritual']):
-                RitualStep.objects.create(
-                    product=product,
-                    step=step,
-                    order=idx
-                )
-            
-            # Create ingredients
-            for idx, ingredient in enumerate(product_data['ingredients']):
-                Ingredient.objects.create(
-                    product=product,
-                    name=ingredient,
-                    order=idx
-                )
-            
-            self.stdout.write(self.style.SUCCESS(f'Created product: {product.name}'))
+        # Diffed against existing rows and applied in bulk, so this can be re-run safely
+        records = [
+            {
+                **{key: value for key, value in product_data.items() if key != 'notes'},
+                'accords': product_data['notes'],
+                'variants': [{**variant, 'stock': 100} for variant in product_data['variants']],
+            }
+            for product_data in products_data
+        ]
+        stats = import_catalog(records)
+        self.stdout.write(self.style.SUCCESS(
+            f'Products created: {stats["inserted"]}, updated: {stats["updated"]}, unchanged: {stats["unchanged"]}'
+        ))
         
         # Create collections
         collections_data = [
@@ -310,10 +244,10 @@ class Command(BaseCommand):
         ]
         
         for collection_data in collections_data:
-            collection = ProductCollection.objects.create(**collection_data)
-            # Add some products to each collection
-            products = Product.objects.all()[:2]
-            collection.products.set(products)
-            self.stdout.write(self.style.SUCCESS(f'Created collection: {collection.title}'))
+            collection, created = ProductCollection.objects.update_or_create(
+                title=collection_data.pop('title'), defaults=collection_data
+            )
+            if created:
+                self.stdout.write(self.style.SUCCESS(f'Created collection: {collection.title}'))
         
         self.stdout.write(self.style.SUCCESS('Database populated successfully!'))
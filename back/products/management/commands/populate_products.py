@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from django.utils.text import slugify
+from products.importer import import_catalog
 from products.models import Product
 from product_collections.models import ProductCollection
 
@@ -86,19 +86,10 @@ class Command(BaseCommand):
             },
         ]
 
-        for product_data in products_data:
-            collection_name = product_data.pop('collection')
-            product, created = Product.objects.get_or_create(
-                id=product_data['id'],
-                defaults={
-                    **product_data,
-                    'collection': collections[collection_name]
-                }
-            )
-            if created:
-                self.stdout.write(self.style.SUCCESS(f'Created product: {product.name}'))
-            else:
-                self.stdout.write(self.style.WARNING(f'Product already exists: {product.name}'))
+        stats = import_catalog(products_data)
+        self.stdout.write(self.style.SUCCESS(
+            f'Products created: {stats["inserted"]}, updated: {stats["updated"]}, unchanged: {stats["unchanged"]}'
+        ))
 
         self.stdout.write(self.style.SUCCESS(f'\nSuccessfully populated database!'))
         self.stdout.write(self.style.SUCCESS(f'Total products: {Product.objects.count()}'))
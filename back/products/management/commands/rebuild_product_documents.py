@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from products import documents
+
+
+class Command(BaseCommand):
+    help = 'Re-render the materialized detail document of every active product'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=documents.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        count = documents.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} product documents'))
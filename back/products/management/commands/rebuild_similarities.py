@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from products import similarity
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related-products similarity table from scratch'
+
+    def handle(self, *args, **options):
+        count = similarity.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Stored {count} product similarities'))
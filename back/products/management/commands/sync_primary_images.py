@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Backfill the denormalized primary_image_url column on every product'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        product_ids = list(Product.objects.values_list('pk', flat=True))
+        updated_count = 0
+        
+        for start in range(0, len(product_ids), batch_size):
+            updated_count += Product.refresh_primary_image_urls(product_ids[start:start + batch_size])
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Synced primary images for {len(product_ids)} products ({updated_count} changed)'
+            )
+        )
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+def backfill_primary_image_url(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    
+    urls = {}
+    images = ProductImage.objects.order_by(
+        'product_id', '-is_primary', 'order', 'id'
+    ).values_list('product_id', 'image_url')
+    for product_id, image_url in images:
+        urls.setdefault(product_id, image_url)
+    
+    for product_id, image_url in urls.items():
+        Product.objects.filter(pk=product_id).update(primary_image_url=image_url)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_collection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image_url',
+            field=models.URLField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.RunPython(backfill_primary_image_url, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+from products import search
+
+
+def create_search_index(apps, schema_editor):
+    search.create_index(schema_editor)
+    
+    Product = apps.get_model('products', 'Product')
+    FragranceNote = apps.get_model('products', 'FragranceNote')
+    Ingredient = apps.get_model('products', 'Ingredient')
+    product_ids = list(Product.objects.values_list('pk', flat=True))
+    documents = search.collect_documents(product_ids, Product, FragranceNote, Ingredient)
+    search.write_documents(product_ids, documents, conn=schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_primary_image_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='products.product')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Product similarities',
+                'ordering': ['-score', 'similar_id'],
+                'indexes': [models.Index(fields=['product', '-score', 'similar'], name='products_similarity_lookup')],
+                'unique_together': {('product', 'similar')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:01
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_product_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fragrancenote',
+            index=models.Index(django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('name')), name='products_note_name_key'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('name')), name='products_ingredient_name_key'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+from products import search
+
+
+def drop_product_fk(apps, schema_editor):
+    search.drop_product_fk(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_similarity_feature_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_product_fk, migrations.RunPython.noop),
+    ]
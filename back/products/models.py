@@ -1,4 +1,6 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Lower, Trim
 from django.utils.text import slugify
 
 
@@ -27,6 +29,9 @@ class Product(models.Model):
     is_bestseller = models.BooleanField(default=False)
     badge = models.CharField(max_length=50, blank=True)
     
+    # Denormalized card image, kept in sync from ProductImage (see products.signals)
+    primary_image_url = models.URLField(max_length=500, blank=True, editable=False)
+    
     # Ratings
     rating_average = models.DecimalField(max_digits=3, decimal_places=2, default=0)
     rating_count = models.IntegerField(default=0)
@@ -38,6 +43,14 @@ class Product(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at']),
+            # Keyset pagination: one (ordering field, id) index per ordering_fields entry
+            models.Index(fields=['created_at', 'id'], name='products_created_keyset'),
+            models.Index(fields=['price', 'id'], name='products_price_keyset'),
+            models.Index(fields=['rating_average', 'id'], name='products_rating_keyset'),
+            models.Index(fields=['name', 'id'], name='products_name_keyset'),
+        ]
         
     def __str__(self):
         return self.name
@@ -46,6 +59,27 @@ class Product(models.Model):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def refresh_primary_image_urls(cls, product_ids):
+        """Recompute primary_image_url for the given products without per-row queries"""
+        product_ids = set(product_ids)
+        urls = dict.fromkeys(product_ids, '')
+        images = ProductImage.objects.filter(
+            product_id__in=product_ids
+        ).order_by('product_id', '-is_primary', 'order', 'id').values_list('product_id', 'image_url')
+        
+        for product_id, image_url in images:
+            # First row per product wins: primary image, else lowest order
+            if not urls[product_id]:
+                urls[product_id] = image_url
+        
+        products = list(cls.objects.filter(pk__in=product_ids).only('pk', 'primary_image_url'))
+        changed = [p for p in products if p.primary_image_url != urls[p.pk]]
+        for product in changed:
+            product.primary_image_url = urls[product.pk]
+        cls.objects.bulk_update(changed, ['primary_image_url'], batch_size=500)
+        return len(changed)
 
 
 class ProductImage(models.Model):
@@ -98,6 +132,10 @@ class FragranceNote(models.Model):
     
     class Meta:
         ordering = ['note_type', 'order']
+        indexes = [
+            # Similarity candidates by note (products.similarity.candidate_index)
+            models.Index(Lower(Trim('name')), name='products_note_name_key'),
+        ]
         
     def __str__(self):
         return f"{self.product.name} - {self.note_type}: {self.name}"
@@ -141,6 +179,39 @@ class Ingredient(models.Model):
     
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(Lower(Trim('name')), name='products_ingredient_name_key'),
+        ]
         
     def __str__(self):
         return f"{self.product.name} - {self.name}"
+
+
+class ProductSimilarity(models.Model):
+    """Precomputed related-product scores, maintained by products.similarity"""
+    
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='similarities')
+    similar = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['-score', 'similar_id']
+        unique_together = ['product', 'similar']
+        indexes = [
+            models.Index(fields=['product', '-score', 'similar'], name='products_similarity_lookup'),
+        ]
+        verbose_name_plural = 'Product similarities'
+        
+    def __str__(self):
+        return f"{self.product_id} ~ {self.similar_id} ({self.score:.3f})"
+
+
+class ProductDocument(models.Model):
+    """Rendered product detail JSON, maintained by products.documents"""
+    
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    document = models.JSONField(encoder=DjangoJSONEncoder)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Document for {self.product_id}"
@@ -0,0 +1,206 @@
+"""
+Full-text product search.
+
+Products are indexed into a vendor-native inverted index kept in the
+``products_search_index`` table: a weighted tsvector with a GIN index on
+PostgreSQL, an FTS5 virtual table ranked with bm25() on SQLite. Other
+database backends fall back to icontains scans.
+
+Field weighting: name > fragrance notes / ingredients > description > story.
+
+The index table is not a Django model, so it has no foreign key to
+products_product: flush and TransactionTestCase truncate only model tables,
+and a constraint from an unlisted table would make that TRUNCATE fail. Rows
+of deleted products are removed by the product refresh (products.signals
+calls index_products, which drops ids that no longer exist).
+"""
+import re
+from django.db import connection, transaction
+from django.db.models import Q
+
+INDEX_TABLE = 'products_search_index'
+
+# Upper bound on ranked matches pulled from the index per query
+MAX_RESULTS = 1000
+
+# bm25() column weights on SQLite, in FTS5 column order (product_id is unindexed)
+SQLITE_WEIGHTS = (0.0, 10.0, 4.0, 4.0, 2.0, 1.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Split a user query into lowercase word tokens"""
+    return [token.lower() for token in _TOKEN_RE.findall(query or '')]
+
+
+def is_supported(conn=None):
+    conn = conn or connection
+    return conn.vendor in ('postgresql', 'sqlite')
+
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+def create_index(schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE IF NOT EXISTS {INDEX_TABLE} ('
+            ' product_id varchar(100) PRIMARY KEY,'
+            ' document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {INDEX_TABLE}_document_gin ON {INDEX_TABLE} USING GIN (document)'
+        )
+    elif conn.vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5('
+            ' product_id UNINDEXED, name, notes, ingredients, description, story,'
+            " tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_product_fk(schema_editor):
+    """Remove the foreign key that indexes created before 0010 carry"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'ALTER TABLE {INDEX_TABLE} DROP CONSTRAINT IF EXISTS {INDEX_TABLE}_product_id_fkey'
+        )
+
+
+def drop_index(schema_editor):
+    if is_supported(schema_editor.connection):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {INDEX_TABLE}')
+
+
+# ---------------------------------------------------------------------------
+# Indexing
+# ---------------------------------------------------------------------------
+
+def collect_documents(product_ids, product_model, note_model, ingredient_model):
+    """Build one searchable document per product in three queries"""
+    documents = {
+        row['id']: {**row, 'notes': [], 'ingredients': []}
+        for row in product_model.objects.filter(pk__in=product_ids).values(
+            'id', 'name', 'description', 'story'
+        )
+    }
+    notes = note_model.objects.filter(product_id__in=documents).values_list('product_id', 'name')
+    for product_id, name in notes:
+        documents[product_id]['notes'].append(name)
+    ingredients = ingredient_model.objects.filter(product_id__in=documents).values_list('product_id', 'name')
+    for product_id, name in ingredients:
+        documents[product_id]['ingredients'].append(name)
+
+    for document in documents.values():
+        document['notes'] = ' '.join(document['notes'])
+        document['ingredients'] = ' '.join(document['ingredients'])
+    return documents
+
+
+def write_documents(product_ids, documents, conn=None):
+    """Replace the index rows for product_ids with the given documents"""
+    conn = conn or connection
+    product_ids = list(product_ids)
+    if not product_ids or not is_supported(conn):
+        return
+
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute(f'DELETE FROM {INDEX_TABLE} WHERE product_id = ANY(%s)', [product_ids])
+            cursor.executemany(
+                f'INSERT INTO {INDEX_TABLE} (product_id, document) VALUES (%s, '
+                " setweight(to_tsvector('english', %s), 'A') ||"
+                " setweight(to_tsvector('english', %s), 'B') ||"
+                " setweight(to_tsvector('english', %s), 'C') ||"
+                " setweight(to_tsvector('english', %s), 'D'))",
+                [
+                    (
+                        doc['id'], doc['name'],
+                        f"{doc['notes']} {doc['ingredients']}",
+                        doc['description'], doc['story'],
+                    )
+                    for doc in documents.values()
+                ],
+            )
+        else:
+            placeholders = ', '.join(['%s'] * len(product_ids))
+            cursor.execute(f'DELETE FROM {INDEX_TABLE} WHERE product_id IN ({placeholders})', product_ids)
+            cursor.executemany(
+                f'INSERT INTO {INDEX_TABLE} (product_id, name, notes, ingredients, description, story)'
+                ' VALUES (%s, %s, %s, %s, %s, %s)',
+                [
+                    (
+                        doc['id'], doc['name'], doc['notes'], doc['ingredients'],
+                        doc['description'], doc['story'],
+                    )
+                    for doc in documents.values()
+                ],
+            )
+
+
+def index_products(product_ids):
+    """Incrementally (re)index the given products; missing ids are dropped"""
+    from .models import Product, FragranceNote, Ingredient
+
+    documents = collect_documents(product_ids, Product, FragranceNote, Ingredient)
+    write_documents(product_ids, documents)
+
+
+def rebuild_index(batch_size=500):
+    """Reindex the whole catalog; returns the number of products indexed"""
+    from .models import Product
+
+    product_ids = list(Product.objects.values_list('pk', flat=True))
+    if is_supported():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+    for start in range(0, len(product_ids), batch_size):
+        index_products(product_ids[start:start + batch_size])
+    return len(product_ids)
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+def search_ids(query, limit=MAX_RESULTS):
+    """
+    Return product ids matching every token of query, best match first.
+    Tokens are prefix-matched so partial words work while typing.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    if connection.vendor == 'postgresql':
+        sql = (
+            f"SELECT product_id FROM {INDEX_TABLE}, to_tsquery('english', %s) query"
+            ' WHERE document @@ query'
+            ' ORDER BY ts_rank_cd(document, query) DESC, product_id'
+            ' LIMIT %s'
+        )
+        params = [' & '.join(f'{token}:*' for token in tokens), limit]
+    elif connection.vendor == 'sqlite':
+        weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+        sql = (
+            f'SELECT product_id FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s'
+            f' ORDER BY bm25({INDEX_TABLE}, {weights}), product_id'
+            ' LIMIT %s'
+        )
+        params = [' '.join(f'"{token}"*' for token in tokens), limit]
+    else:
+        from .models import Product
+
+        condition = Q()
+        for token in tokens:
+            condition &= (
+                Q(name__icontains=token) | Q(description__icontains=token) | Q(story__icontains=token)
+            )
+        return list(Product.objects.filter(condition).values_list('pk', flat=True)[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -41,26 +41,113 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'order']
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Render a subset of fields: ``fields`` (from ?fields=) keeps only the named
+    fields, ``include`` (from ?include=) adds Meta.optional_fields, which are
+    left out by default. ``field_prefetch`` maps each field to the relations it
+    reads, so views prefetch only what will be rendered.
+    """
+    
+    field_prefetch = {}
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = set(self.select_fields() if fields is None else fields)
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+    
+    @classmethod
+    def select_fields(cls, fields=None, include=None):
+        """Field names to render; raises ValueError on unknown names"""
+        available = list(cls.Meta.fields)
+        unknown = [name for name in [*(fields or []), *(include or [])] if name not in available]
+        if unknown:
+            raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+        optional = set(getattr(cls.Meta, 'optional_fields', ()))
+        if fields:
+            selected = [name for name in available if name in fields]
+        else:
+            selected = [name for name in available if name not in optional]
+        selected += [name for name in available if name in (include or []) and name not in selected]
+        return selected
+    
+    @classmethod
+    def prefetch_for(cls, fields):
+        """Relations to prefetch for the given field names"""
+        relations = []
+        for name in fields:
+            for relation in cls.field_prefetch.get(name, ()):
+                if relation not in relations:
+                    relations.append(relation)
+        return relations
+
+
+class ProductFieldsMixin(SparseFieldsMixin):
+    """Representations shared by the list and detail serializers"""
+    
+    field_prefetch = {
+        'images': ['images'],
+        'gallery': ['images'],
+        'notes': ['notes'],
+        'accords': ['notes'],
+        'highlights': ['highlights'],
+        'ritual_steps': ['ritual_steps'],
+        'ritual': ['ritual_steps'],
+        'ingredients': ['ingredients'],
+        'sizes': ['variants'],
+    }
+    
+    def get_rating(self, obj):
+        return {
+            'average': float(obj.rating_average),
+            'count': obj.rating_count
+        }
+    
+    def get_gallery(self, obj):
+        """Return image URLs for frontend gallery"""
+        return [img.image_url for img in obj.images.all()]
+    
+    def get_sizes(self, obj):
+        """Return variants in frontend format"""
+        return ProductVariantSerializer(obj.variants.all(), many=True).data
+    
+    def get_accords(self, obj):
+        """Return notes grouped by type for frontend"""
+        notes = obj.notes.all()
+        return {
+            'top': [n.name for n in notes if n.note_type == 'top'],
+            'heart': [n.name for n in notes if n.note_type == 'heart'],
+            'base': [n.name for n in notes if n.note_type == 'base'],
+        }
+
+
+class ProductListSerializer(ProductFieldsMixin, serializers.ModelSerializer):
     """Simplified serializer for product lists"""
     
     image = serializers.SerializerMethodField()
     collection_name = serializers.CharField(source='collection.title', read_only=True)
     collection_slug = serializers.CharField(source='collection.slug', read_only=True)
+    rating = serializers.SerializerMethodField()
+    gallery = serializers.SerializerMethodField()
+    sizes = serializers.SerializerMethodField()
+    accords = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
-        fields = ['id', 'name', 'slug', 'price', 'image', 'badge', 'is_bestseller', 'collection_name', 'collection_slug']
+        fields = [
+            'id', 'name', 'slug', 'price', 'image', 'badge', 'is_bestseller', 'collection_name', 'collection_slug',
+            # Only with ?include=
+            'description', 'rating', 'gallery', 'sizes', 'accords',
+        ]
+        optional_fields = ['description', 'rating', 'gallery', 'sizes', 'accords']
     
     def get_image(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
-        if primary_image:
-            return primary_image.image_url
-        first_image = obj.images.first()
-        return first_image.image_url if first_image else None
+        # Denormalized on Product so cards never query images per row
+        return obj.primary_image_url or None
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(ProductFieldsMixin, serializers.ModelSerializer):
     """Detailed serializer for single product view"""
     
     images = ProductImageSerializer(many=True, read_only=True)
@@ -99,29 +186,6 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         ingredients = obj.ingredients.all()
         return [ing.name for ing in ingredients]
     
-    def get_rating(self, obj):
-        return {
-            'average': float(obj.rating_average),
-            'count': obj.rating_count
-        }
-    
-    def get_gallery(self, obj):
-        """Return image URLs for frontend gallery"""
-        return [img.image_url for img in obj.images.all()]
-    
-    def get_sizes(self, obj):
-        """Return variants in frontend format"""
-        return ProductVariantSerializer(obj.variants.all(), many=True).data
-    
-    def get_accords(self, obj):
-        """Return notes grouped by type for frontend"""
-        notes = obj.notes.all()
-        return {
-            'top': [n.name for n in notes if n.note_type == 'top'],
-            'heart': [n.name for n in notes if n.note_type == 'heart'],
-            'base': [n.name for n in notes if n.note_type == 'base'],
-        }
-    
     def get_ritual(self, obj):
         """Return ritual steps as array for frontend"""
         return [step.step for step in obj.ritual_steps.all()]
@@ -0,0 +1,167 @@
+import threading
+from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from config import cache as api_cache
+from .models import (
+    Product, ProductImage, ProductVariant, FragranceNote,
+    ProductHighlight, RitualStep, Ingredient
+)
+from . import documents, keys, search, similarity
+
+_pending = threading.local()
+
+# Product columns the search index and similarity features are built from
+INDEXED_FIELDS = ['name', 'description', 'story', 'price', 'collection_id', 'is_active']
+
+# changed_models entry for a product save that left INDEXED_FIELDS alone
+# (rating, badge, flags): pages change, search and similarities do not
+PRODUCT_DISPLAY = 'product_display'
+
+# changed_models entry for variant stock levels moving without crossing zero
+# (orders.inventory): the product's detail document and cached detail / batch
+# entries are refreshed, while lists, facets and the catalog cache (where only
+# in_stock matters; ?include=sizes counts may lag) are left alone
+STOCK = 'stock'
+
+# Refreshes of more products than this (bulk imports) rebuild the similarity
+# table in one candidate-pruned pass instead of refreshing product by product,
+# and drop the products cache namespace instead of purging each product's tags
+BULK_REFRESH_THRESHOLD = 200
+
+
+def invalidate_product_caches(product_ids, extra_tags=(), catalog=True):
+    """
+    Purge cached responses that render any of the given products; with
+    catalog=False only the products' own entries (detail, batch items)
+    """
+    tags = {api_cache.CATALOG, *extra_tags} if catalog else set(extra_tags)
+    product_ids = list(product_ids)
+    if catalog and len(product_ids) > BULK_REFRESH_THRESHOLD:
+        # Product tags are only used in the products namespace
+        api_cache.invalidate(*tags, api_cache.namespace_tag('products'))
+        return
+    for start in range(0, len(product_ids), documents.BATCH_SIZE):
+        rows = Product.objects.filter(pk__in=product_ids[start:start + documents.BATCH_SIZE]).values_list(
+            'pk', 'slug', 'collection__slug'
+        )
+        for pk, slug, collection_slug in rows:
+            tags.update([api_cache.product_tag(pk), api_cache.product_tag(slug)])
+            if collection_slug and catalog:
+                tags.add(api_cache.collection_tag(collection_slug))
+    tags.update(api_cache.product_tag(pk) for pk in product_ids)
+    api_cache.invalidate(*tags)
+
+
+def refresh_products(product_ids, changed_models=None):
+    """
+    Rebuild everything derived from a product and its child rows.
+
+    changed_models limits the work to what the edited models feed into;
+    bulk jobs that bypass model signals call this with just the ids. Work
+    is done documents.BATCH_SIZE products at a time, so a bulk import never
+    loads every touched product (with all its child rows) at once.
+    """
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+    changed_models = set(changed_models or [Product, ProductImage, FragranceNote, Ingredient])
+    reindex = changed_models & {Product, FragranceNote, Ingredient}
+
+    for start in range(0, len(product_ids), documents.BATCH_SIZE):
+        batch = product_ids[start:start + documents.BATCH_SIZE]
+        if changed_models - {Product, PRODUCT_DISPLAY, STOCK}:
+            # Child rows changed: bump updated_at so ETags / Last-Modified move
+            Product.objects.filter(pk__in=batch).update(updated_at=timezone.now())
+        if changed_models & {Product, ProductImage}:
+            Product.refresh_primary_image_urls(batch)
+        if reindex:
+            search.index_products(batch)
+        # Detail documents embed every child table and the collection
+        documents.refresh(batch)
+    if reindex:
+        if len(product_ids) > BULK_REFRESH_THRESHOLD:
+            similarity.rebuild()
+        else:
+            similarity.refresh(product_ids)
+    invalidate_product_caches(product_ids, catalog=changed_models != {STOCK})
+
+
+def _flush_pending():
+    changes = getattr(_pending, 'changes', None)
+    tags = getattr(_pending, 'tags', set())
+    _pending.changes = defaultdict(set)
+    _pending.tags = set()
+    if tags:
+        api_cache.invalidate(*tags)
+    if changes:
+        refresh_products(set().union(*changes.values()), changed_models=set(changes))
+
+
+def mark_product_changed(product_id, model=Product, tags=()):
+    """
+    Queue a product for refresh once the current transaction commits, so
+    an admin save touching many inline rows refreshes each product once
+    """
+    if not hasattr(_pending, 'changes'):
+        _pending.changes = defaultdict(set)
+        _pending.tags = set()
+    _pending.changes[model].add(product_id)
+    _pending.tags.update(tags)
+    transaction.on_commit(_flush_pending)
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_keys(sender, instance, update_fields=None, **kwargs):
+    """
+    Note the stored slug and collection so a rename also purges the old URL,
+    and the indexed columns so a save that leaves them alone skips reindexing
+    """
+    if update_fields is not None and not set(update_fields) & {'slug', 'collection', *INDEXED_FIELDS}:
+        # e.g. reviews updating the rating: nothing keyed or indexed can change
+        instance._previous_keys = (instance.slug, None, instance.is_active)
+        instance._previous_indexed = tuple(getattr(instance, field) for field in INDEXED_FIELDS)
+        return
+    previous = Product.objects.filter(pk=instance.pk).values('slug', 'collection__slug', *INDEXED_FIELDS).first()
+    instance._previous_keys = previous and (previous['slug'], previous['collection__slug'], previous['is_active'])
+    instance._previous_indexed = previous and tuple(previous[field] for field in INDEXED_FIELDS)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance, **kwargs):
+    # The row may be gone (delete) or renamed, so tag its keys from memory
+    tags = [api_cache.product_tag(instance.pk), api_cache.product_tag(instance.slug)]
+    previous = getattr(instance, '_previous_keys', None)
+    if previous:
+        previous_slug, previous_collection_slug, was_active = previous
+        tags.append(api_cache.product_tag(previous_slug))
+        if previous_collection_slug:
+            tags.append(api_cache.collection_tag(previous_collection_slug))
+    if (
+        previous is None or kwargs['signal'] is post_delete
+        or previous_slug != instance.slug or was_active != instance.is_active
+    ):
+        # New, deleted, renamed or (de)activated: URL keys changed
+        transaction.on_commit(keys.invalidate)
+    indexed = tuple(getattr(instance, field) for field in INDEXED_FIELDS)
+    if kwargs['signal'] is post_save and getattr(instance, '_previous_indexed', None) == indexed:
+        mark_product_changed(instance.pk, model=PRODUCT_DISPLAY, tags=tags)
+    else:
+        mark_product_changed(instance.pk, tags=tags)
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=ProductVariant)
+@receiver([post_save, post_delete], sender=FragranceNote)
+@receiver([post_save, post_delete], sender=ProductHighlight)
+@receiver([post_save, post_delete], sender=RitualStep)
+@receiver([post_save, post_delete], sender=Ingredient)
+def product_child_changed(sender, instance, **kwargs):
+    """
+    Keep denormalized product data (primary_image_url, search index,
+    similarities) and cached responses in sync whenever a child row is
+    added, edited (including admin inlines) or removed
+    """
+    mark_product_changed(instance.product_id, model=sender)
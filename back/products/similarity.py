@@ -0,0 +1,234 @@
+"""
+Related-product similarity index.
+
+Each active product is described by a weighted feature set: its fragrance
+notes (base notes weigh most, top notes least), ingredients, collection and
+price band. Similarity is the weighted Jaccard index of two feature sets
+(sum of minimum weights over sum of maximum weights). The best TOP_N
+neighbours per product are stored in ProductSimilarity so the related
+endpoint is a single indexed lookup with stable ordering.
+
+Only products that share a feature can score above zero, so candidates come
+from an inverted index (feature -> products). A feature held by more than
+CANDIDATE_LIMIT products (a price band, a catch-all note like musk) still
+counts in the score but does not make its products candidates of each other;
+this keeps rebuild close to linear in catalog size and lets refresh read only
+the changed products' candidates.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.functions import Lower, Trim
+
+# Neighbours stored per product; the API serves the first few
+TOP_N = 12
+
+NOTE_WEIGHTS = {'top': 1.0, 'heart': 2.0, 'base': 3.0}
+INGREDIENT_WEIGHT = 1.0
+COLLECTION_WEIGHT = 2.0
+PRICE_BAND_WEIGHT = 1.0
+
+# Upper bounds of the price bands (GHS); anything above falls in the last band
+PRICE_BANDS = [Decimal('50'), Decimal('100'), Decimal('200'), Decimal('400')]
+
+# Features shared by more products than this do not pick candidates
+CANDIDATE_LIMIT = 500
+
+
+def price_band(price):
+    for band, upper in enumerate(PRICE_BANDS):
+        if price <= upper:
+            return band
+    return len(PRICE_BANDS)
+
+
+def feature_name(field):
+    """Normalized note / ingredient name, as a query expression (see the models' indexes)"""
+    return Lower(Trim(field))
+
+
+def load_features(product_ids=None):
+    """Feature vectors for the active products (all, or those among product_ids), in three queries"""
+    from .models import Product, FragranceNote, Ingredient
+
+    products = Product.objects.filter(is_active=True)
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+    features = {}
+    for pk, collection_id, price in products.values_list('pk', 'collection_id', 'price'):
+        vector = {('price', price_band(price)): PRICE_BAND_WEIGHT}
+        if collection_id:
+            vector[('collection', collection_id)] = COLLECTION_WEIGHT
+        features[pk] = vector
+    if not features:
+        return features
+
+    notes = FragranceNote.objects.filter(product_id__in=features).values_list('product_id', 'note_type', 'name')
+    for product_id, note_type, name in notes:
+        key = ('note', name.strip().lower())
+        vector = features[product_id]
+        vector[key] = max(vector.get(key, 0.0), NOTE_WEIGHTS.get(note_type, 1.0))
+
+    ingredients = Ingredient.objects.filter(product_id__in=features).values_list('product_id', 'name')
+    for product_id, name in ingredients:
+        features[product_id].setdefault(('ingredient', name.strip().lower()), INGREDIENT_WEIGHT)
+
+    return features
+
+
+def _feature_rows(kind, values):
+    """(value, product id) pairs of one feature kind among active products, as a queryset"""
+    from .models import Product, FragranceNote, Ingredient
+
+    if kind in ('note', 'ingredient'):
+        model = FragranceNote if kind == 'note' else Ingredient
+        rows = model.objects.filter(product__is_active=True).annotate(value=feature_name('name'), item=F('product_id'))
+    elif kind == 'collection':
+        rows = Product.objects.filter(is_active=True).annotate(value=F('collection_id'), item=F('pk'))
+    else:
+        band = Case(
+            *(When(price__lte=upper, then=Value(band)) for band, upper in enumerate(PRICE_BANDS)),
+            default=Value(len(PRICE_BANDS)),
+        )
+        rows = Product.objects.filter(is_active=True).annotate(value=band, item=F('pk'))
+    return rows.filter(value__in=values).order_by()
+
+
+def candidate_index(keys):
+    """
+    {feature key: ids of the active products that have it} for the given
+    keys, leaving out keys held by more than CANDIDATE_LIMIT products
+    """
+    values = defaultdict(set)
+    for kind, value in keys:
+        values[kind].add(value)
+    index = defaultdict(set)
+    for kind, kind_values in values.items():
+        rows = _feature_rows(kind, kind_values)
+        sizes = rows.values('value').annotate(products=Count('item', distinct=True))
+        selective = [size['value'] for size in sizes if size['products'] <= CANDIDATE_LIMIT]
+        for value, pk in _feature_rows(kind, selective).values_list('value', 'item') if selective else ():
+            index[(kind, value)].add(pk)
+    return index
+
+
+def weighted_jaccard(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    shared = 0.0
+    for key, weight in a.items():
+        other = b.get(key)
+        if other is not None:
+            shared += min(weight, other)
+    if not shared:
+        return 0.0
+    total = sum(a.values()) + sum(b.values()) - shared
+    return shared / total
+
+
+def _top(scores):
+    """Best TOP_N (similar_id, score) pairs, ties broken by id for stability"""
+    ranked = sorted(((pk, score) for pk, score in scores.items() if score > 0), key=lambda x: (-x[1], x[0]))
+    return ranked[:TOP_N]
+
+
+def _candidates(vector, index):
+    return set().union(*(index.get(key, ()) for key in vector))
+
+
+def rebuild():
+    """Recompute the whole table; returns the number of rows written"""
+    from .models import ProductSimilarity
+
+    features = load_features()
+    index = defaultdict(set)
+    for pk, vector in features.items():
+        for key in vector:
+            index[key].add(pk)
+    index = {key: pks for key, pks in index.items() if len(pks) <= CANDIDATE_LIMIT}
+
+    scores = defaultdict(dict)
+    for pk, vector in features.items():
+        for other in _candidates(vector, index):
+            # Each pair once
+            if other > pk:
+                score = weighted_jaccard(vector, features[other])
+                if score:
+                    scores[pk][other] = score
+                    scores[other][pk] = score
+
+    rows = [
+        ProductSimilarity(product_id=pk, similar_id=similar_id, score=score)
+        for pk in sorted(features)
+        for similar_id, score in _top(scores[pk])
+    ]
+    with transaction.atomic():
+        ProductSimilarity.objects.all().delete()
+        ProductSimilarity.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def neighbour_scores(product_ids):
+    """{pk: {candidate: score}} for the active products among product_ids, reading only their candidates"""
+    features = load_features(product_ids)
+    index = candidate_index({key for vector in features.values() for key in vector})
+    others = set().union(*index.values()) - set(features)
+    features.update(load_features(others) if others else {})
+
+    scores = {}
+    for pk in product_ids:
+        vector = features.get(pk)
+        if vector is None:
+            continue
+        scores[pk] = {}
+        for other in _candidates(vector, index) - {pk}:
+            score = weighted_jaccard(vector, features[other])
+            if score:
+                scores[pk][other] = score
+    return scores
+
+
+def refresh(product_ids):
+    """
+    Incrementally refresh similarities after the given products changed.
+
+    The changed products, and every product whose list names one of them
+    (it may have to drop it), get their lists recomputed from their
+    candidates. The changed products' other candidates can only gain a
+    changed product, so their stored lists are merged with the new scores
+    and rewritten only if they moved.
+    """
+    from .models import ProductSimilarity
+
+    changed = set(product_ids)
+    if not changed:
+        return
+    listing = set(ProductSimilarity.objects.filter(similar_id__in=changed).values_list('product_id', flat=True))
+    scores = neighbour_scores(changed | listing)
+    rewrite = {pk: _top(scores.get(pk, {})) for pk in changed | listing}
+
+    gained = defaultdict(dict)
+    for pk in changed & set(scores):
+        for other, score in scores[pk].items():
+            if other not in rewrite:
+                gained[other][pk] = score
+    stored = defaultdict(dict)
+    for pk, similar_id, score in ProductSimilarity.objects.filter(product_id__in=gained).values_list(
+        'product_id', 'similar_id', 'score'
+    ):
+        stored[pk][similar_id] = score
+    for pk, new_scores in gained.items():
+        current = _top(stored[pk])
+        top = _top({**stored[pk], **new_scores})
+        if top != current:
+            rewrite[pk] = top
+
+    rows = [
+        ProductSimilarity(product_id=pk, similar_id=similar_id, score=score)
+        for pk, top in rewrite.items()
+        for similar_id, score in top
+    ]
+    with transaction.atomic():
+        ProductSimilarity.objects.filter(product_id__in=rewrite).delete()
+        ProductSimilarity.objects.bulk_create(rows, batch_size=1000)
@@ -0,0 +1,215 @@
+import base64
+import io
+import json
+from unittest import mock
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from product_collections.models import ProductCollection
+from . import cards, export, importer, search, signals, similarity
+from .models import FragranceNote, Ingredient, Product, ProductImage, ProductSimilarity, ProductVariant
+from .serializers import ProductListSerializer
+from .views import ProductViewSet
+
+TEST_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'products-tests-{alias}'}
+    for alias in settings.CACHES
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CardRendererContractTests(TestCase):
+    """cards.render must produce exactly what ProductListSerializer produces"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        collection = ProductCollection.objects.create(
+            title='Maison Baabie', slug='maison-baabie', description='', image='https://example.com/c.jpg'
+        )
+        first = Product.objects.create(
+            id='oud-noir', name='Oud Noir', slug='oud-noir', description='Smoky oud', price='245.50',
+            collection=collection, badge='New', is_bestseller=True, rating_average='4.35', rating_count=12,
+        )
+        ProductImage.objects.create(product=first, image_url='https://example.com/a.jpg', is_primary=True)
+        # No collection, no image, no rating
+        Product.objects.create(id='plain', name='Plain', slug='plain', description='', price='10')
+        Product.objects.create(
+            id='rose', name='Rose Ébène', slug='rose-ebene', description='Rose\nand "ebony"', price='0.5',
+            collection=collection,
+        )
+    
+    def selections(self):
+        renderable = [name for name in ProductListSerializer.Meta.fields if name in cards.RENDERERS]
+        optional = [name for name in ProductListSerializer.Meta.optional_fields if name in cards.RENDERERS]
+        yield ProductListSerializer.select_fields()
+        for name in optional:
+            yield ProductListSerializer.select_fields(include=[name])
+        yield ProductListSerializer.select_fields(include=optional)
+        for name in renderable:
+            yield ProductListSerializer.select_fields(fields=[name])
+        yield renderable
+    
+    def test_cards_match_serializer(self):
+        renderer = JSONRenderer()
+        queryset = ProductViewSet.queryset.order_by('-created_at', '-pk')
+        for fields in self.selections():
+            with self.subTest(fields=fields):
+                self.assertTrue(cards.can_render(fields))
+                expected = ProductListSerializer(
+                    queryset.prefetch_related(*ProductListSerializer.prefetch_for(fields)), many=True, fields=fields
+                ).data
+                actual = cards.render(cards.values_queryset(queryset, fields), fields)
+                self.assertEqual(renderer.render(actual), renderer.render(expected))
+    
+    def test_child_row_fields_use_the_serializer(self):
+        for name in ProductListSerializer.Meta.optional_fields:
+            if name not in cards.RENDERERS:
+                self.assertFalse(cards.can_render(ProductListSerializer.select_fields(include=[name])))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CsvRoundTripTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product = Product.objects.create(
+                id='amber', name='Amber, "Noir"', slug='amber', description='Line one\nline two', price='120.00'
+            )
+            FragranceNote.objects.create(product=self.product, note_type='top', name='Oud | Amber')
+            FragranceNote.objects.create(product=self.product, note_type='base', name='Musk: white')
+            Ingredient.objects.create(product=self.product, name='Alcohol [denat.]')
+            ProductVariant.objects.create(
+                product=self.product, label='EDP: 50ml', volume='50|ml', price='120.00', sku='AMB:50', stock=3
+            )
+    
+    def export_csv(self):
+        return ''.join(export.render(export.iter_records(), 'csv'))
+    
+    def test_export_reimports_unchanged(self):
+        text = self.export_csv()
+        record, = importer.read_feed(io.StringIO(text), 'csv')
+        self.assertEqual(record['accords'], {'top': ['Oud | Amber'], 'heart': [], 'base': ['Musk: white']})
+        self.assertEqual(record['ingredients'], ['Alcohol [denat.]'])
+        self.assertEqual(record['sizes'][0]['label'], 'EDP: 50ml')
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = importer.import_catalog(importer.read_feed(io.StringIO(text), 'csv'))
+        self.assertEqual((stats['updated'], stats['unchanged']), (0, 1))
+    
+    def test_older_separated_cells_still_import(self):
+        text = 'id,name,price,top_notes,variants\namber,Amber,120.00,Oud|Rose,AMB:EDP:50ml:120.00:3\n'
+        record, = importer.read_feed(io.StringIO(text), 'csv')
+        self.assertEqual(record['accords']['top'], ['Oud', 'Rose'])
+        self.assertEqual(
+            record['sizes'], [{'sku': 'AMB', 'label': 'EDP', 'volume': '50ml', 'price': '120.00', 'stock': '3'}]
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SimilarityTests(TestCase):
+    NOTES = ['Oud', 'Rose', 'Musk', 'Amber', 'Vanilla', 'Cedar']
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(12):
+                product = Product.objects.create(
+                    id=f'p{i:02}', name=f'Scent {i}', slug=f'scent-{i}', description='', price=40 + 35 * (i % 5)
+                )
+                for offset, note_type in enumerate(['top', 'heart', 'base']):
+                    FragranceNote.objects.create(
+                        product=product, note_type=note_type, name=self.NOTES[(i + offset * 2) % len(self.NOTES)]
+                    )
+        similarity.rebuild()
+    
+    def stored(self):
+        return sorted(ProductSimilarity.objects.values_list('product_id', 'similar_id', 'score'))
+    
+    def assert_refresh_matches_rebuild(self):
+        refreshed = self.stored()
+        similarity.rebuild()
+        self.assertEqual(refreshed, self.stored())
+    
+    def test_refresh_matches_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            FragranceNote.objects.filter(product_id='p03', note_type='base').update(name='Saffron')
+            FragranceNote.objects.create(product_id='p03', note_type='top', name='Oud')
+            Product.objects.get(pk='p03').notes.first().save()
+        self.assert_refresh_matches_rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.get(pk='p07').delete()
+        self.assert_refresh_matches_rebuild()
+    
+    def test_refresh_matches_rebuild_with_pruned_candidates(self):
+        # Every note is held by more products than the limit except Saffron
+        with mock.patch.object(similarity, 'CANDIDATE_LIMIT', 4):
+            similarity.rebuild()
+            with self.captureOnCommitCallbacks(execute=True):
+                FragranceNote.objects.create(product_id='p01', note_type='base', name='Saffron')
+                FragranceNote.objects.create(product_id='p05', note_type='base', name='saffron ')
+            best = ProductSimilarity.objects.filter(product_id='p01').values_list('similar_id', flat=True).first()
+            self.assertEqual(best, 'p05')
+            self.assert_refresh_matches_rebuild()
+    
+    def test_display_only_save_skips_reindex(self):
+        product = Product.objects.get(pk='p02')
+        with mock.patch.object(similarity, 'refresh') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.rating_average = 4
+                product.save(update_fields=['rating_average', 'updated_at'])
+            with self.captureOnCommitCallbacks(execute=True):
+                product.badge = 'New'
+                product.save()
+            refresh.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                product.price = 500
+                product.save()
+            refresh.assert_called_once_with(['p02'])
+    
+    def test_bulk_refresh_rebuilds_in_one_pass(self):
+        FragranceNote.objects.filter(name='Rose').update(name='Iris')
+        with mock.patch.object(signals, 'BULK_REFRESH_THRESHOLD', 5), \
+                mock.patch.object(similarity, 'refresh') as refresh:
+            signals.refresh_products(Product.objects.values_list('pk', flat=True))
+        refresh.assert_not_called()
+        self.assert_refresh_matches_rebuild()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SearchIndexTests(TestCase):
+    def test_deleted_product_leaves_the_index(self):
+        # The index table has no foreign key; the product refresh cleans it up
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(id='vetiver', name='Vetiver Ink', slug='vetiver-ink', description='', price='90')
+        self.assertEqual(search.search_ids('vetiver'), ['vetiver'])
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.get(pk='vetiver').delete()
+        self.assertEqual(search.search_ids('vetiver'), [])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CursorTests(TestCase):
+    ORDERING = ['-created_at', '-pk']
+    
+    def setUp(self):
+        for i in range(3):
+            Product.objects.create(id=f'c{i}', name=f'Cursor {i}', slug=f'cursor-{i}', description='', price='10')
+    
+    def cursor(self, position):
+        payload = json.dumps({'o': self.ORDERING, 'p': position, 'r': False})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+    
+    def test_next_link_pages_on(self):
+        first = self.client.get('/api/products/', {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(first['results']) + len(second['results']), 3)
+    
+    @override_settings(ALLOWED_HOSTS=['shop.example', 'api.example'])
+    def test_cached_pages_link_to_the_requesting_host(self):
+        for host in ('shop.example', 'api.example', 'shop.example'):
+            with self.subTest(host=host):
+                response = self.client.get('/api/products/', {'page_size': 2}, HTTP_HOST=host)
+                self.assertTrue(response.json()['next'].startswith(f'http://{host}/'))
+    
+    def test_bad_values_with_valid_ordering_are_not_found(self):
+        for position in (['garbage', 'x'], [None, None], [{'a': 1}, 'x'], ['2026-01-01T00:00:00+00:00']):
+            with self.subTest(position=position):
+                response = self.client.get('/api/products/', {'cursor': self.cursor(position)})
+                self.assertEqual(response.status_code, 404)
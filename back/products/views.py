@@ -1,15 +1,35 @@
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
-from django.db.models import Q
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
-from .models import Product
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.conf import settings
+from config.cache import cached_items, cached_response, product_tag, CATALOG
+from config.conditional import conditional_get
+from .models import Product, ProductSimilarity
 from .serializers import ProductListSerializer, ProductDetailSerializer
+from . import cards, documents, export, facets, keys, search
+
+
+def catalog_state(request, **kwargs):
+    """Validators shared by every product list: any product row can appear in one"""
+    stats = Product.objects.aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    return stats['last_modified'], [stats['count']]
+
+
+def product_state(request, slug=None):
+    """Validators for a single product, looked up by slug or ID"""
+    pk = keys.resolve(slug)
+    if pk is None:
+        return None
+    # Stock changes re-render the document without touching the product row
+    stamps = Product.objects.filter(pk=pk).values_list('updated_at', 'document__updated_at').first()
+    if stamps is None:
+        return None
+    return max(stamp for stamp in stamps if stamp is not None), []
 
 
-@method_decorator(cache_page(60 * 15), name='list')  # Cache list for 15 minutes
-@method_decorator(cache_page(60 * 30), name='retrieve')  # Cache detail for 30 minutes
 class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing products.
@@ -19,11 +39,11 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     featured: Get featured products
     bestsellers: Get bestseller products
     search: Search products by name or description
+    batch: Get several products by ID or slug in one request
+    export: Stream the (filtered) catalog as NDJSON or CSV
     """
     
-    queryset = Product.objects.filter(is_active=True).prefetch_related(
-        'images', 'variants', 'notes', 'highlights', 'ritual_steps', 'ingredients'
-    )
+    queryset = Product.objects.filter(is_active=True).select_related('collection')
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description', 'story']
     ordering_fields = ['price', 'created_at', 'rating_average', 'name']
@@ -35,7 +55,61 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             return ProductDetailSerializer
         return ProductListSerializer
     
+    def get_selected_fields(self):
+        """Fields to render, from ?fields= and ?include= (comma-separated)"""
+        if not hasattr(self, '_selected_fields'):
+            params = self.request.query_params
+            requested = {
+                name: [value.strip() for value in params.get(name, '').split(',') if value.strip()]
+                for name in ('fields', 'include')
+            }
+            try:
+                self._selected_fields = self.get_serializer_class().select_fields(**requested)
+            except ValueError as exc:
+                raise ParseError(str(exc))
+        return self._selected_fields
+    
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_selected_fields())
+        return super().get_serializer(*args, **kwargs)
+    
+    def with_prefetch(self, queryset):
+        """Prefetch only the relations the selected fields render"""
+        relations = self.get_serializer_class().prefetch_for(self.get_selected_fields())
+        return queryset.prefetch_related(*relations)
+    
+    def product_cards(self, queryset, pks=None):
+        """
+        Product list data for queryset (with pks: those products, in that order).
+        Rendered from values() rows when every selected field allows it.
+        """
+        fields = self.get_selected_fields()
+        if cards.can_render(fields):
+            rows = cards.values_queryset(queryset, fields)
+            if pks is None:
+                return cards.render(rows, fields)
+            by_pk = {row['pk']: row for row in rows.filter(pk__in=pks)}
+            return cards.render([by_pk[pk] for pk in pks if pk in by_pk], fields)
+        if pks is None:
+            return self.get_serializer(queryset, many=True).data
+        products = queryset.in_bulk(pks)
+        return self.get_serializer([products[pk] for pk in pks if pk in products], many=True).data
+    
+    def paginated_cards(self, queryset):
+        """Paginated response for queryset, through the card renderer when possible"""
+        fields = self.get_selected_fields()
+        if cards.can_render(fields):
+            page = self.paginate_queryset(cards.values_queryset(queryset, fields))
+            return self.get_paginated_response(cards.render(page, fields))
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+    
     def get_queryset(self):
+        queryset = facets.apply_filters(self.get_unfaceted_queryset(), self.request.query_params)
+        return self.with_prefetch(queryset)
+    
+    def get_unfaceted_queryset(self):
+        """Active products with the plain (non-facet) filters applied"""
         queryset = super().get_queryset()
         
         # Filter by price range
@@ -58,70 +132,132 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset
     
+    @conditional_get(catalog_state)
+    @cached_response([CATALOG], namespace='products')
+    def list(self, request, *args, **kwargs):
+        """List products; ?facets=true adds per-facet counts"""
+        response = self.paginated_cards(self.filter_queryset(self.get_queryset()))
+        if request.query_params.get('facets') == 'true':
+            queryset = self.filter_queryset(self.get_unfaceted_queryset())
+            response.data['facets'] = facets.facet_counts(queryset, request.query_params)
+        return response
+    
+    @conditional_get(product_state)
+    @cached_response(lambda request, slug=None: [product_tag(slug)], namespace='products')
     def retrieve(self, request, *args, **kwargs):
         """Get product by slug or ID"""
-        slug_or_id = kwargs.get('slug')
-        try:
-            # Try to get by slug first
-            instance = self.queryset.get(slug=slug_or_id)
-        except Product.DoesNotExist:
-            # Try by ID
-            try:
-                instance = self.queryset.get(id=slug_or_id)
-            except Product.DoesNotExist:
-                return Response({'detail': 'Not found.'}, status=404)
+        pk = keys.resolve(kwargs.get('slug'))
+        if pk is None:
+            return Response({'detail': 'Not found.'}, status=404)
+        
+        # Materialized detail document: one primary-key read
+        document = documents.get(pk)
+        if document is not None:
+            return Response({name: document[name] for name in self.get_selected_fields()})
         
+        # Not built yet (see rebuild_product_documents)
+        instance = self.with_prefetch(self.queryset.filter(pk=pk)).first()
+        if instance is None:
+            return Response({'detail': 'Not found.'}, status=404)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
-    @method_decorator(cache_page(60 * 30))  # Cache for 30 minutes
+    @conditional_get(catalog_state)
+    @cached_response([CATALOG], namespace='products')
     def featured(self, request):
         """Get featured products"""
-        featured_products = self.queryset.filter(is_featured=True).select_related()[:8]
-        serializer = ProductListSerializer(featured_products, many=True)
-        return Response(serializer.data)
+        featured_products = self.with_prefetch(self.queryset.filter(is_featured=True))[:8]
+        return Response(self.product_cards(featured_products))
     
     @action(detail=False, methods=['get'])
-    @method_decorator(cache_page(60 * 30))  # Cache for 30 minutes
+    @conditional_get(catalog_state)
+    @cached_response([CATALOG], namespace='products')
     def bestsellers(self, request):
         """Get bestseller products"""
-        bestsellers = self.queryset.filter(is_bestseller=True).select_related()[:8]
-        serializer = ProductListSerializer(bestsellers, many=True)
-        return Response(serializer.data)
+        bestsellers = self.with_prefetch(self.queryset.filter(is_bestseller=True))[:8]
+        return Response(self.product_cards(bestsellers))
     
     @action(detail=False, methods=['get'])
+    @conditional_get(catalog_state)
+    @cached_response([CATALOG], namespace='products')
     def search(self, request):
-        """Search products"""
+        """Search products, best match first (paginated)"""
         query = request.query_params.get('q', '')
-        if query:
-            products = self.queryset.filter(
-                Q(name__icontains=query) |
-                Q(description__icontains=query) |
-                Q(story__icontains=query)
+        if not query.strip():
+            return self.paginated_cards(self.filter_queryset(self.get_queryset()))
+        
+        # Rank in the full-text index, then apply the regular filters
+        ranked_ids = search.search_ids(query)
+        visible = set(self.get_queryset().filter(pk__in=ranked_ids).values_list('pk', flat=True))
+        page_ids = self.paginate_queryset([pk for pk in ranked_ids if pk in visible])
+        
+        return self.get_paginated_response(self.product_cards(self.get_queryset(), page_ids))
+    
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """Get products by ID or slug (?ids=a,b,c), in request order"""
+        requested = [key.strip() for key in request.query_params.get('ids', '').split(',') if key.strip()]
+        if not requested:
+            return Response({'error': 'ids is required'}, status=400)
+        if len(requested) > settings.PRODUCT_BATCH_LIMIT:
+            return Response(
+                {'error': f'At most {settings.PRODUCT_BATCH_LIMIT} ids per request'}, status=400
             )
-        else:
-            products = self.queryset.all()
         
-        serializer = ProductListSerializer(products, many=True)
-        return Response(serializer.data)
+        key_map = keys.key_map()
+        resolved = {key: key_map.get(key) for key in requested}
+        pks = list(dict.fromkeys(pk for pk in resolved.values() if pk is not None))
+        
+        def load(missing):
+            products = self.with_prefetch(self.queryset).in_bulk(missing)
+            return {pk: self.get_serializer(product).data for pk, product in products.items()}
+        
+        # One cache entry per product, reused by any batch that contains it
+        cards = cached_items(
+            {pk: [product_tag(pk)] for pk in pks}, load,
+            namespace='products', variant=','.join(self.get_selected_fields()),
+        )
+        return Response({
+            'results': [cards[pk] for pk in pks if pk in cards],
+            'missing': [key for key, pk in resolved.items() if pk is None or pk not in cards],
+        })
     
     @action(detail=True, methods=['get'])
+    @conditional_get(catalog_state)
+    @cached_response([CATALOG], namespace='products')
     def related(self, request, slug=None):
         """Get related products"""
-        # Handle both slug and ID
-        slug_or_id = slug
-        try:
-            # Try to get by slug first
-            product = self.queryset.get(slug=slug_or_id)
-        except Product.DoesNotExist:
-            # Try by ID
-            try:
-                product = self.queryset.get(id=slug_or_id)
-            except Product.DoesNotExist:
-                return Response({'detail': 'Not found.'}, status=404)
+        pk = keys.resolve(slug)
+        if pk is None:
+            return Response({'detail': 'Not found.'}, status=404)
         
-        # Simple related logic: exclude current product, get 3 random
-        related = self.queryset.exclude(id=product.id).order_by('?')[:3]
-        serializer = ProductListSerializer(related, many=True)
-        return Response(serializer.data)
+        # Precomputed neighbours (products.similarity), best match first
+        similar_ids = list(
+            ProductSimilarity.objects.filter(product_id=pk).values_list('similar_id', flat=True)[:3]
+        )
+        related = self.product_cards(self.get_queryset(), similar_ids) if similar_ids else []
+        if not related:
+            # Not indexed yet (see rebuild_similarities): newest from the same collection
+            related = self.product_cards(self.get_queryset().filter(
+                collection_id=Product.objects.filter(pk=pk).values('collection_id')
+            ).exclude(pk=pk).order_by('-created_at', 'pk')[:3])
+        return Response(related)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the catalog as NDJSON (default) or CSV (?output=csv)"""
+        # Not ?format=, which DRF reserves for renderer selection
+        fmt = request.query_params.get('output', 'ndjson')
+        if fmt not in export.FORMATS:
+            return Response({'error': f'Unsupported output: {fmt}'}, status=400)
+        
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).prefetch_related(
+            *export.EXPORT_PREFETCH
+        )
+        response = StreamingHttpResponse(
+            export.render(export.iter_records(queryset), fmt),
+            content_type=export.FORMATS[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="catalog.{fmt}"'
+        return response
@@ -26,7 +26,7 @@ class Command(BaseCommand):
             
             product.rating_average = stats['avg_rating'] or 0
             product.rating_count = stats['count'] or 0
-            product.save(update_fields=['rating_average', 'rating_count'])
+            product.save(update_fields=['rating_average', 'rating_count', 'updated_at'])
             
             if old_avg != product.rating_average or old_count != product.rating_count:
                 updated_count += 1
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_updated_at_index'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'updated_at'], name='reviews_rev_product_7bbef4_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_keyset_indexes'),
+        ('reviews', '0002_review_product_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-is_featured', '-created_at', '-id'], name='reviews_product_keyset'),
+        ),
+    ]
@@ -42,6 +42,9 @@ class Review(models.Model):
         indexes = [
             models.Index(fields=['product', '-created_at']),
             models.Index(fields=['is_approved', '-created_at']),
+            models.Index(fields=['product', 'updated_at']),
+            # Keyset pagination of a product's reviews
+            models.Index(fields=['product', '-is_featured', '-created_at', '-id'], name='reviews_product_keyset'),
         ]
     
     def __str__(self):
@@ -23,4 +23,4 @@ def update_product_rating(sender, instance, **kwargs):
     # Update product
     product.rating_average = stats['avg_rating'] or 0
     product.rating_count = stats['count'] or 0
-    product.save(update_fields=['rating_average', 'rating_count'])
+    product.save(update_fields=['rating_average', 'rating_count', 'updated_at'])
@@ -1,18 +1,38 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, Max, Q
+from config.conditional import conditional_get
 from .models import Review
 from .serializers import ReviewSerializer, ReviewCreateSerializer, ReviewListSerializer
 from products.models import Product
 
 
+def product_reviews_state(request, product_id=None):
+    """Validators for a product's review list and stats"""
+    stats = Review.objects.filter(product_id=product_id).aggregate(
+        last_modified=Max('updated_at'), count=Count('id')
+    )
+    return stats['last_modified'], [stats['count']]
+
+
+def featured_reviews_state(request):
+    stats = Review.objects.filter(is_featured=True).aggregate(
+        last_modified=Max('updated_at'), count=Count('id')
+    )
+    return stats['last_modified'], [stats['count']]
+
+
 class ProductReviewListView(generics.ListAPIView):
     """
     List all approved reviews for a specific product
     """
     serializer_class = ReviewListSerializer
     
+    @conditional_get(product_reviews_state)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         product_id = self.kwargs.get('product_id')
         return Review.objects.filter(
@@ -52,6 +72,7 @@ class ReviewCreateView(generics.CreateAPIView):
 
 
 @api_view(['GET'])
+@conditional_get(product_reviews_state)
 def product_review_stats(request, product_id):
     """
     Get review statistics for a product
@@ -102,6 +123,7 @@ def product_review_stats(request, product_id):
 
 
 @api_view(['GET'])
+@conditional_get(featured_reviews_state)
 def featured_reviews(request):
     """
     Get featured reviews across all products
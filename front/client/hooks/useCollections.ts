@@ -1,4 +1,4 @@
-import { useQuery } from '@tanstack/react-query';
+import { keepPreviousData, useInfiniteQuery, useQuery } from '@tanstack/react-query';
 import { api } from '@/lib/api';
 
 export function useCollections() {
@@ -16,6 +16,19 @@ export function useCollection(slug: string | undefined) {
   });
 }
 
+export function useCollectionProducts(slug: string | undefined, ordering?: string) {
+  return useInfiniteQuery({
+    queryKey: ['collection', slug, 'products', ordering],
+    queryFn: ({ pageParam }) =>
+      api.collections.products(slug!, ordering ? { ordering } : undefined, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next,
+    // Keep the current grid on screen while a new sort order loads
+    placeholderData: keepPreviousData,
+    enabled: !!slug,
+  });
+}
+
 export function useFeaturedCollections() {
   return useQuery({
     queryKey: ['collections', 'featured'],
@@ -0,0 +1,10 @@
+import { useQuery } from '@tanstack/react-query';
+import { api, type ApiBasketLine } from '@/lib/api';
+
+export function useQuote(items: ApiBasketLine[], promoCode?: string) {
+  return useQuery({
+    queryKey: ['quote', items, promoCode],
+    queryFn: () => api.orders.quote(items, promoCode),
+    enabled: items.length > 0,
+  });
+}
@@ -59,7 +59,44 @@ export interface ApiCollection {
 }
 
 export interface ApiCollectionDetail extends ApiCollection {
-  products: ApiProduct[];
+  created_at: string;
+  updated_at: string;
+}
+
+// Cursor-paginated list; follow `next` for the following page
+export interface ApiPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+export interface ApiBasketLine {
+  product_id?: string;
+  variant_id?: number;
+  quantity: number;
+}
+
+// Authoritative basket pricing from the backend (amounts are decimal strings)
+export interface ApiQuote {
+  currency: string;
+  lines: Array<{
+    product_id: string;
+    variant_id: number | null;
+    name: string;
+    image: string;
+    variant_label: string;
+    quantity: number;
+    unit_price: string;
+    line_total: string;
+  }>;
+  subtotal: string;
+  shipping: string;
+  tax: string;
+  discount: string;
+  total: string;
+  total_minor: number;
+  promo_code: string;
+  promo_applied: boolean;
 }
 
 // Fetch with timeout and caching
@@ -116,13 +153,24 @@ export const api = {
 
     search: async (query: string): Promise<ApiProduct[]> => {
       const response = await fetchWithTimeout(`${API_URL}/products/search/?q=${encodeURIComponent(query)}`);
-      return response.json();
+      const data = await response.json();
+      return data.results || data;
     },
 
     related: async (slug: string): Promise<ApiProduct[]> => {
       const response = await fetchWithTimeout(`${API_URL}/products/${slug}/related/`);
       return response.json();
     },
+
+    // Several products (ids or slugs) in one request, e.g. cart or wishlist
+    batch: async (ids: string[]): Promise<ApiProduct[]> => {
+      if (ids.length === 0) return [];
+      const response = await fetchWithTimeout(
+        `${API_URL}/products/batch/?ids=${ids.map(encodeURIComponent).join(',')}`
+      );
+      const data = await response.json();
+      return data.results || [];
+    },
   },
 
   // Collections
@@ -139,6 +187,23 @@ export const api = {
       return response.json();
     },
 
+    // One page of a collection's products; `cursor` is a previous page's `next` URL
+    products: async (
+      slug: string,
+      params?: Record<string, string>,
+      cursor?: string | null,
+    ): Promise<ApiPage<ApiProduct>> => {
+      const url = new URL(cursor || `${API_URL}/collections/${slug}/products/`);
+      if (!cursor && params) {
+        Object.entries(params).forEach(([key, value]) => {
+          url.searchParams.append(key, value);
+        });
+      }
+      const response = await fetchWithTimeout(url.toString());
+      if (!response.ok) throw new Error('Collection not found');
+      return response.json();
+    },
+
     featured: async (): Promise<ApiCollection[]> => {
       const response = await fetchWithTimeout(`${API_URL}/collections/featured/`);
       const data = await response.json();
@@ -207,6 +272,16 @@ export const api = {
       return response.json();
     },
 
+    quote: async (items: ApiBasketLine[], promoCode?: string): Promise<ApiQuote> => {
+      const response = await fetch(`${API_URL}/orders/quote/`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ items, promo_code: promoCode || '' }),
+      });
+      if (!response.ok) throw new Error('Failed to price your basket');
+      return response.json();
+    },
+
     get: async (orderId: string) => {
       const response = await fetch(`${API_URL}/orders/${orderId}/`);
       if (!response.ok) throw new Error('Order not found');
@@ -1,25 +1,33 @@
-import { useMemo } from "react";
+import { useMemo, useState } from "react";
 import { useParams, Link } from "react-router-dom";
 import { ProductCard, type Product } from "@/components/product/ProductCard";
-import { useCollection } from "@/hooks/useCollections";
+import { useCollection, useCollectionProducts } from "@/hooks/useCollections";
 import { Loader2, ArrowLeft } from "lucide-react";
 import { Button } from "@/components/ui/button";
 
 export default function Collection() {
   const { slug } = useParams();
   const { data: collection, isLoading, error } = useCollection(slug);
+  const [ordering, setOrdering] = useState("-created_at");
+  const {
+    data: productPages,
+    isLoading: productsLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useCollectionProducts(slug, ordering);
 
   // Transform API products to frontend format
   const products: Product[] = useMemo(() => {
-    if (!collection?.products) return [];
-    return collection.products.map((p: any) => ({
+    if (!productPages) return [];
+    return productPages.pages.flatMap((page) => page.results).map((p: any) => ({
       id: p.id,
       name: p.name,
       price: parseFloat(p.price),
       image: p.image,
       badge: p.badge || (p.is_bestseller ? "Bestseller" : undefined),
     }));
-  }, [collection]);
+  }, [productPages]);
 
   if (isLoading) {
     return (
@@ -76,7 +84,7 @@ export default function Collection() {
               {collection.description}
             </p>
             <p className="mt-4 text-sm text-muted-foreground">
-              {products.length} {products.length === 1 ? 'product' : 'products'}
+              {collection.product_count} {collection.product_count === 1 ? 'product' : 'products'}
             </p>
           </div>
           
@@ -96,19 +104,43 @@ export default function Collection() {
       {/* Products Grid */}
       {products.length > 0 ? (
         <div className="animate-fade-up animate-delay-2">
+          <div className="mb-6 flex items-center justify-end gap-2">
+            <label className="text-responsive-sm text-muted-foreground">Sort</label>
+            <select
+              value={ordering}
+              onChange={(e) => setOrdering(e.target.value)}
+              className="rounded-md border bg-background px-2 py-1 text-sm outline-none focus:ring-2 focus:ring-primary/20 focus:border-primary transition-colors"
+            >
+              <option value="-created_at">Newest</option>
+              <option value="price">Price: Low to high</option>
+              <option value="-price">Price: High to low</option>
+              <option value="-rating_average">Top rated</option>
+            </select>
+          </div>
           <div className="grid gap-4 md:gap-6 grid-cols-2 lg:grid-cols-3 xl:grid-cols-4">
             {products.map((product, index) => (
               <div 
                 key={product.id} 
                 style={{ 
                   animation: `fadeSlideUp 0.7s ease forwards`, 
-                  animationDelay: `${index * 0.08}s` 
+                  animationDelay: `${(index % 20) * 0.08}s` 
                 }}
               >
                 <ProductCard product={product} />
               </div>
             ))}
           </div>
+          {hasNextPage && (
+            <div className="mt-8 flex justify-center">
+              <Button variant="outline" onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+                {isFetchingNextPage ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
+        </div>
+      ) : productsLoading ? (
+        <div className="flex justify-center py-12">
+          <Loader2 className="h-8 w-8 animate-spin text-primary" />
         </div>
       ) : (
         <div className="text-center py-12 animate-fade-up animate-delay-2">
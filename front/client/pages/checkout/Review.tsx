@@ -1,15 +1,16 @@
-import { useState } from "react";
+import { useMemo, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { formatCurrency } from "@/lib/utils";
 import { useCart } from "@/context/CartContext";
 import { api } from "@/lib/api";
+import { useQuote } from "@/hooks/useOrders";
 import { initializePaystack } from "@/lib/paystack";
 import { Button } from "@/components/ui/button";
 import { Loader2 } from "lucide-react";
 
 export default function Review() {
   const navigate = useNavigate();
-  const { items, subtotal, clear } = useCart();
+  const { items, clear } = useCart();
   const [isProcessing, setIsProcessing] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -17,9 +18,17 @@ export default function Review() {
   const shippingInfo = JSON.parse(sessionStorage.getItem('shipping_info') || '{}');
   const paymentInfo = JSON.parse(sessionStorage.getItem('payment_info') || '{}');
 
-  const shipping = subtotal > 150 ? 0 : 12;
-  const tax = subtotal * 0.08;
-  const total = subtotal + shipping + tax;
+  // Totals are priced by the backend, exactly as the order will be
+  const basket = useMemo(() => items.map(item => ({
+    product_id: item.productId || item.id,
+    variant_id: item.variantId,
+    quantity: item.qty,
+  })), [items]);
+  const { data: quote, isLoading: isPricing, error: quoteError } = useQuote(basket);
+  const subtotal = quote ? parseFloat(quote.subtotal) : 0;
+  const shipping = quote ? parseFloat(quote.shipping) : 0;
+  const tax = quote ? parseFloat(quote.tax) : 0;
+  const total = quote ? parseFloat(quote.total) : 0;
 
   const placeOrder = async () => {
     if (items.length === 0) {
@@ -46,15 +55,7 @@ export default function Review() {
         shipping_postal_code: shippingInfo.postal_code || '00000',
         shipping_country: 'Ghana',
         payment_method: 'paystack',
-        items: items.map(item => ({
-          product_id: item.productId || item.id,
-          variant_id: item.variantId,
-          name: item.name,
-          image: item.image || '',
-          variant_label: '',
-          quantity: item.qty,
-          price: item.price,
-        })),
+        items: basket,
       };
 
       const order = await api.orders.create(orderData);
@@ -78,7 +79,7 @@ export default function Review() {
       await initializePaystack({
         publicKey: config.public_key,
         email: shippingInfo.email,
-        amount: total,
+        amount: parseFloat(order.total),
         reference: paymentInit.data.reference,
         metadata: {
           order_id: order.id,
@@ -121,9 +122,9 @@ export default function Review() {
         <p className="text-sm text-muted-foreground mt-1">Confirm your order details before payment</p>
       </div>
       
-      {error && (
+      {(error || quoteError) && (
         <div className="mb-4 rounded-lg bg-destructive/10 border-2 border-destructive/20 p-4">
-          <p className="text-sm font-medium text-destructive">{error}</p>
+          <p className="text-sm font-medium text-destructive">{error || (quoteError as Error).message}</p>
         </div>
       )}
 
@@ -158,14 +159,14 @@ export default function Review() {
             <div className="text-center py-8 text-sm text-muted-foreground">Your cart is empty</div>
           ) : (
             <div className="space-y-3">
-              {items.map((it) => (
+              {items.map((it, index) => (
                 <div key={it.id} className="flex items-center gap-3">
                   <img src={it.image} className="h-12 w-12 md:h-14 md:w-14 rounded-lg object-cover shrink-0" alt={it.name} />
                   <div className="flex-1 min-w-0">
                     <div className="font-semibold text-sm truncate">{it.name}</div>
                     <div className="text-xs text-muted-foreground">Qty: {it.qty}</div>
                   </div>
-                  <div className="font-bold text-sm whitespace-nowrap">{formatCurrency(it.price * it.qty)}</div>
+                  <div className="font-bold text-sm whitespace-nowrap">{formatCurrency(quote ? parseFloat(quote.lines[index].line_total) : it.price * it.qty)}</div>
                 </div>
               ))}
             </div>
@@ -212,7 +213,7 @@ export default function Review() {
             className="w-full h-12 font-bold text-base" 
             size="lg"
             onClick={placeOrder}
-            disabled={isProcessing || items.length === 0}
+            disabled={isProcessing || isPricing || !quote}
           >
             {isProcessing ? (
               <>
@@ -238,7 +239,7 @@ export default function Review() {
             className="flex-1 h-12 font-bold" 
             size="lg"
             onClick={placeOrder}
-            disabled={isProcessing || items.length === 0}
+            disabled={isProcessing || isPricing || !quote}
           >
             {isProcessing ? (
               <>